@@ -0,0 +1,69 @@
+"""
+Startup phase timing.
+
+`app.main` imports this module first, so the clock starts right after the
+interpreter has started. Each `mark` closes the phase that began at the
+previous mark; `measure` times a phase that runs alongside the others,
+such as the background cache warmup.
+"""
+
+import importlib
+import sys
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+# Heavy or optional modules kept out of boot; `preload` imports them during warmup
+DEFERRED_MODULES = ("httpx", "numpy", "twilio", "apscheduler", "ijson", "brotli")
+
+_t0 = time.perf_counter()
+_last = _t0
+_phases: list[dict] = []
+_ready_at: Optional[float] = None
+
+
+def _ms(t: float) -> float:
+    return round((t - _t0) * 1000, 1)
+
+
+def mark(name: str):
+    """End the current phase, naming it `name`."""
+    global _last
+    now = time.perf_counter()
+    _phases.append({"name": name, "started_ms": _ms(_last), "duration_ms": round((now - _last) * 1000, 1)})
+    _last = now
+
+
+@contextmanager
+def measure(name: str):
+    """Time a phase that may overlap others."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        now = time.perf_counter()
+        _phases.append({"name": name, "started_ms": _ms(started), "duration_ms": round((now - started) * 1000, 1)})
+
+
+def preload():
+    """Import the installed deferred modules; blocking, so run it off the event loop."""
+    for name in DEFERRED_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+
+
+def ready():
+    """Record that the app is serving requests."""
+    global _ready_at
+    if _ready_at is None:
+        _ready_at = time.perf_counter()
+
+
+def report() -> dict:
+    return {
+        "ready_ms": _ms(_ready_at) if _ready_at is not None else None,
+        "phases": list(_phases),
+        "loaded": {name: name in sys.modules for name in DEFERRED_MODULES},
+    }
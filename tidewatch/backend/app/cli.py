@@ -0,0 +1,504 @@
+"""
+TideWatch command-line tools.
+
+Usage:
+    python -m app.cli score parcels.csv scored.csv [--chunk-size 5000] [--workers 4]
+    python -m app.cli backtest [--water-levels PATH] [--weather PATH] [--grid-search]
+    python -m app.cli grid-table nws_grid.json [--step 0.01]
+    python -m app.cli boot-check [--budget-ms 2000] [--runs 5]
+
+`score` streams a CSV (or Parquet, with pyarrow installed) of parcels with
+`latitude` and `longitude` columns, scores each one against the forecast for
+its NWS grid cell and its nearest tide gauge, and streams the results out in
+the same format. An optional `elevation_ft` column skips the USGS lookup for
+that row.
+
+`backtest` replays the risk formula over stored history (see
+app.engine.backtest) for the sample locations or a locations CSV, reports
+when alerts would have fired, and optionally grid-searches the weights.
+
+`grid-table` asks the NWS `/points` endpoint for the grid cell of every point
+on a lattice over the coverage area and writes a lookup table for
+`NWS_GRID_TABLE_PATH` (see app.services.nws_grid).
+
+`boot-check` times `import app.main` in fresh interpreters and exits
+non-zero when the median goes over `BOOT_BUDGET_MS` or a deferred module
+(NumPy, httpx, Twilio, ...) was loaded at import; run it in CI to catch
+cold-start regressions.
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, Optional
+
+from app.models.schemas import TideData, WeatherData, ElevationData, RiskGrade
+from app import log
+from app.config import settings
+from app.services import noaa_service, weather_service, elevation_service, stations, nws_grid
+from app.services.http_client import close_client, get_client
+from app.engine.risk_engine import calculate_risk
+
+# Columns `score` adds to each row, with their Parquet types
+RESULT_TYPES = {
+    "elevation_ft": "float64",
+    "elevation_source": "string",
+    "tide_station": "string",
+    "score": "float64",
+    "grade": "string",
+    "confidence": "float64",
+    "tidal_factor": "float64",
+    "elevation_factor": "float64",
+    "precipitation_factor": "float64",
+    "wind_surge_factor": "float64",
+}
+RESULT_COLUMNS = list(RESULT_TYPES)
+
+PARQUET_EXTENSIONS = (".parquet", ".pq")
+
+
+def _is_parquet(path: str) -> bool:
+    return path.lower().endswith(PARQUET_EXTENSIONS)
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        return pyarrow
+    except ImportError:
+        raise SystemExit("Parquet support requires pyarrow (pip install pyarrow)")
+
+
+# --- Streaming input/output ---
+
+
+def _iter_csv_chunks(path: str, chunk_size: int) -> Iterator[list[dict]]:
+    with open(path, newline="", encoding="utf-8") as f:
+        chunk = []
+        for row in csv.DictReader(f):
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def _iter_parquet_chunks(path: str, chunk_size: int) -> Iterator[list[dict]]:
+    pa = _require_pyarrow()
+    parquet_file = pa.parquet.ParquetFile(path)
+    for batch in parquet_file.iter_batches(batch_size=chunk_size):
+        yield batch.to_pylist()
+
+
+def iter_chunks(path: str, chunk_size: int) -> Iterator[list[dict]]:
+    """Yield the input file as lists of row dicts, `chunk_size` rows at a time."""
+    if _is_parquet(path):
+        return _iter_parquet_chunks(path, chunk_size)
+    return _iter_csv_chunks(path, chunk_size)
+
+
+class _CsvWriter:
+    def __init__(self, path: str):
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._writer: Optional[csv.DictWriter] = None
+
+    def write(self, rows: list[dict]):
+        if not rows:
+            return
+        if self._writer is None:
+            self._writer = csv.DictWriter(self._file, fieldnames=list(rows[0].keys()))
+            self._writer.writeheader()
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._file.close()
+
+
+def _output_schema(pa, input_path: str):
+    """Input columns (CSV columns as strings) followed by the typed result columns."""
+    if _is_parquet(input_path):
+        fields = list(pa.parquet.read_schema(input_path))
+    else:
+        with open(input_path, newline="", encoding="utf-8") as f:
+            header = next(csv.reader(f), [])
+        fields = [pa.field(name, pa.string()) for name in header]
+    fields = [f for f in fields if f.name not in RESULT_TYPES]
+    fields += [pa.field(name, pa.type_for_alias(type_name)) for name, type_name in RESULT_TYPES.items()]
+    return pa.schema(fields)
+
+
+class _ParquetWriter:
+    def __init__(self, path: str, input_path: str):
+        self._pa = _require_pyarrow()
+        # Declared up front: a first chunk of skipped rows would infer null types
+        self._schema = _output_schema(self._pa, input_path)
+        self._writer = self._pa.parquet.ParquetWriter(path, self._schema)
+
+    def write(self, rows: list[dict]):
+        if rows:
+            self._writer.write_table(self._pa.Table.from_pylist(rows, schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+
+def open_writer(path: str, input_path: str):
+    """Open a streaming row writer; format is chosen by file extension."""
+    if _is_parquet(path):
+        return _ParquetWriter(path, input_path)
+    return _CsvWriter(path)
+
+
+# --- Scoring (runs in worker processes) ---
+
+_worker_tides: dict[str, TideData] = {}
+
+
+def _init_worker(tides: dict[str, TideData]):
+    """Receive the shared per-station tide snapshot once per worker process."""
+    global _worker_tides
+    _worker_tides = tides
+
+
+def _score_chunk(
+    rows: list[dict],
+    elevations: list[Optional[ElevationData]],
+    weathers: list[Optional[WeatherData]],
+) -> list[dict]:
+    results = []
+    for row, elevation, weather in zip(rows, elevations, weathers):
+        out = dict(row)
+        if elevation is None:
+            out.update({col: None for col in RESULT_COLUMNS})
+        else:
+            station, _ = stations.nearest_stations(elevation.latitude, elevation.longitude)[0]
+            risk = calculate_risk(_worker_tides[station.id], weather, elevation)
+            out.update(
+                elevation_ft=elevation.elevation_ft,
+                elevation_source=elevation.source,
+                tide_station=station.id,
+                score=risk.score,
+                grade=risk.grade.value,
+                confidence=risk.confidence,
+                tidal_factor=risk.factors.tidal_factor,
+                elevation_factor=risk.factors.elevation_factor,
+                precipitation_factor=risk.factors.precipitation_factor,
+                wind_surge_factor=risk.factors.wind_surge_factor,
+            )
+        results.append(out)
+    return results
+
+
+# --- Elevation resolution (runs on the event loop) ---
+
+
+def _parse_float(value) -> Optional[float]:
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _local_elevation(row: dict) -> tuple[Optional[float], Optional[float], Optional[ElevationData]]:
+    """Parse coordinates and any elevation supplied in the input row."""
+    lat = _parse_float(row.get("latitude"))
+    lon = _parse_float(row.get("longitude"))
+    elevation_ft = _parse_float(row.get("elevation_ft"))
+    if lat is None or lon is None or elevation_ft is None:
+        return lat, lon, None
+    return lat, lon, ElevationData(latitude=lat, longitude=lon, elevation_ft=elevation_ft, source="input")
+
+
+async def _lookup_elevation(lat: float, lon: float, semaphore: asyncio.Semaphore) -> ElevationData:
+    async with semaphore:
+        return await elevation_service.get_elevation(lat, lon)
+
+
+async def _resolve_elevations(rows: list[dict], semaphore: asyncio.Semaphore) -> list[Optional[ElevationData]]:
+    """Resolve one elevation per row; only rows without one go to the service layer."""
+    elevations: list[Optional[ElevationData]] = []
+    lookups = {}
+    for i, row in enumerate(rows):
+        lat, lon, elevation = _local_elevation(row)
+        elevations.append(elevation)
+        if elevation is None and lat is not None and lon is not None:
+            lookups[i] = _lookup_elevation(lat, lon, semaphore)
+
+    if lookups:
+        for i, elevation in zip(lookups.keys(), await asyncio.gather(*lookups.values())):
+            elevations[i] = elevation
+    return elevations
+
+
+async def _resolve_weather(elevations: list[Optional[ElevationData]]) -> list[Optional[WeatherData]]:
+    """Forecast per row from its grid cell; each distinct cell is fetched (or cached) once."""
+    cells = [
+        nws_grid.grid_cell(e.latitude, e.longitude) if e is not None else None
+        for e in elevations
+    ]
+    distinct = list({cell for cell in cells if cell is not None})
+    forecasts = await asyncio.gather(*(weather_service.get_weather_data(cell=cell) for cell in distinct))
+    by_cell = dict(zip(distinct, forecasts))
+    # Rows sharing a cell share the object, which pickles once per chunk
+    return [by_cell.get(cell) for cell in cells]
+
+
+# --- Commands ---
+
+
+def _report(rows: int, skipped: int, started: float, final: bool = False):
+    elapsed = time.perf_counter() - started
+    rate = rows / elapsed if elapsed > 0 else 0.0
+    label = "Done" if final else "Progress"
+    print(
+        f"[TideWatch] {label}: {rows} rows ({skipped} skipped) in {elapsed:.1f}s — {rate:,.0f} rows/s",
+        file=sys.stderr,
+    )
+
+
+async def score(args: argparse.Namespace) -> int:
+    """Score every parcel in the input file and stream results to the output file."""
+    started = time.perf_counter()
+
+    # One tide snapshot per station for the whole run; forecasts are per cell
+    station_tides = await asyncio.gather(*(noaa_service.get_tide_data(s.id) for s in stations.STATIONS))
+    tides = {tide.station_id: tide for tide in station_tides}
+
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(args.concurrency)
+    max_pending = args.workers * 2
+    pending: deque = deque()
+    rows_done = 0
+    skipped = 0
+
+    writer = open_writer(args.output, args.input)
+    try:
+        with ProcessPoolExecutor(
+            max_workers=args.workers,
+            initializer=_init_worker,
+            initargs=(tides,),
+        ) as pool:
+
+            async def drain_one():
+                nonlocal rows_done, skipped
+                results = await pending.popleft()
+                writer.write(results)
+                rows_done += len(results)
+                skipped += sum(1 for r in results if r["score"] is None)
+                _report(rows_done, skipped, started)
+
+            for rows in iter_chunks(args.input, args.chunk_size):
+                # Resolve elevations for this chunk while earlier chunks score
+                elevations = await _resolve_elevations(rows, semaphore)
+                weathers = await _resolve_weather(elevations)
+                pending.append(loop.run_in_executor(pool, _score_chunk, rows, elevations, weathers))
+                while len(pending) > max_pending:
+                    await drain_one()
+
+            while pending:
+                await drain_one()
+    finally:
+        writer.close()
+
+    _report(rows_done, skipped, started, final=True)
+    return 0
+
+
+async def _backtest_locations(path: Optional[str]) -> list:
+    """Locations from a CSV (name, latitude, longitude[, elevation_ft]) or the sample set."""
+    from app.engine.backtest import Location
+    from app.routers.risk_router import SAMPLE_LOCATIONS
+
+    if path:
+        rows = [row for chunk in iter_chunks(path, 1000) for row in chunk]
+    else:
+        rows = [dict(loc) for loc in SAMPLE_LOCATIONS]
+
+    semaphore = asyncio.Semaphore(8)
+    elevations = await _resolve_elevations(rows, semaphore)
+    return [
+        Location(row.get("name") or row.get("address", ""), elev.latitude, elev.longitude, elev.elevation_ft)
+        for row, elev in zip(rows, elevations)
+        if elev is not None
+    ]
+
+
+async def backtest(args: argparse.Namespace) -> int:
+    """Replay stored history for a set of locations and report alerts and skill."""
+    from app.engine.backtest import load_history, replay, grid_search
+
+    started = time.perf_counter()
+    threshold = RiskGrade(args.threshold)
+    history = load_history(args.water_levels, args.weather)
+    locations = await _backtest_locations(args.locations)
+    loaded = time.perf_counter()
+
+    results, metrics = replay(history, locations, threshold=threshold)
+    replayed = time.perf_counter()
+
+    steps = len(history.times)
+    print(f"Replayed {steps:,} steps x {len(locations)} locations in {replayed - loaded:.2f}s "
+          f"(load {loaded - started:.2f}s), alerting at grade {threshold.value} or worse")
+    for loc in results:
+        print(f"\n{loc.name} ({loc.elevation_ft:.1f} ft): {len(loc.episodes)} alert episodes, "
+              f"{loc.alert_steps * 0.1:.1f} alert hours")
+        for ep in loc.episodes[: args.max_episodes]:
+            print(f"  {ep.start:%Y-%m-%d %H:%M} → {ep.end:%Y-%m-%d %H:%M}  peak {ep.peak_score}")
+        if len(loc.episodes) > args.max_episodes:
+            print(f"  ... {len(loc.episodes) - args.max_episodes} more")
+
+    print(f"\nCurrent weights: {metrics.model_dump_json()}")
+
+    if args.grid_search:
+        ranked = grid_search(history, locations, step=args.step, threshold=threshold, workers=args.workers)
+        print(f"\nGrid search: {len(ranked)} weight sets in {time.perf_counter() - replayed:.2f}s")
+        for m in ranked[: args.top]:
+            print(f"  {m.model_dump_json()}")
+    return 0
+
+
+async def grid_table(args: argparse.Namespace) -> int:
+    """Build the lat/lon -> NWS grid cell table from the `/points` endpoint."""
+    points = nws_grid.lattice_points(args.step)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    client = get_client()
+
+    async def lookup(lat: float, lon: float) -> nws_grid.GridCell:
+        async with semaphore:
+            resp = await client.get(
+                f"{settings.nws_base_url}/points/{lat:.4f},{lon:.4f}", headers=weather_service.NWS_HEADERS
+            )
+            resp.raise_for_status()
+            props = resp.json()["properties"]
+            return nws_grid.GridCell(props["gridId"], props["gridX"], props["gridY"])
+
+    started = time.perf_counter()
+    cells = await asyncio.gather(*(lookup(lat, lon) for lat, lon in points))
+    nws_grid.dump_table(args.output, args.step, cells)
+    print(
+        f"[TideWatch] Wrote {len(points)} points ({len(set(cells))} cells) to {args.output} "
+        f"in {time.perf_counter() - started:.1f}s",
+        file=sys.stderr,
+    )
+    return 0
+
+
+_BOOT_PROBE = (
+    "import time; t = time.perf_counter(); import app.main; "
+    "from app import boot; import json; "
+    "print(json.dumps({'import_ms': (time.perf_counter() - t) * 1000, **boot.report()}))"
+)
+
+
+async def boot_check(args: argparse.Namespace) -> int:
+    """Time app imports in fresh interpreters against the boot budget."""
+    budget = args.budget_ms if args.budget_ms is not None else settings.boot_budget_ms
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    wall_ms, reports = [], []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable, "-c", _BOOT_PROBE,
+            cwd=backend_dir, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        )
+        out, err = await proc.communicate()
+        wall_ms.append((time.perf_counter() - started) * 1000)
+        if proc.returncode != 0:
+            print(err.decode(), file=sys.stderr)
+            return proc.returncode
+        reports.append(json.loads(out.decode().strip().splitlines()[-1]))
+
+    median_wall = statistics.median(wall_ms)
+    median_import = statistics.median(r["import_ms"] for r in reports)
+    loaded = sorted({name for r in reports for name, is_loaded in r["loaded"].items() if is_loaded})
+
+    print(f"Boot over {args.runs} runs: median {median_wall:.0f} ms wall, "
+          f"{median_import:.0f} ms importing app.main (budget {budget} ms)")
+    for phase in reports[-1]["phases"]:
+        print(f"  {phase['name']:<10} {phase['duration_ms']:>8.1f} ms")
+
+    failed = False
+    if median_wall > budget:
+        print(f"FAIL: boot time {median_wall:.0f} ms is over the {budget} ms budget")
+        failed = True
+    if loaded:
+        print(f"FAIL: deferred modules loaded at import: {', '.join(loaded)}")
+        failed = True
+    return 1 if failed else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="TideWatch command-line tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    score_parser = commands.add_parser("score", help="Bulk-score a CSV/Parquet file of parcels")
+    score_parser.add_argument("input", help="Input .csv or .parquet with latitude/longitude columns")
+    score_parser.add_argument("output", help="Output .csv or .parquet path")
+    score_parser.add_argument("--chunk-size", type=int, default=5000, help="Rows per chunk (default: 5000)")
+    score_parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1, help="Scoring processes (default: CPU count)"
+    )
+    score_parser.add_argument(
+        "--concurrency", type=int, default=16, help="Max concurrent elevation lookups (default: 16)"
+    )
+    score_parser.set_defaults(handler=score)
+
+    backtest_parser = commands.add_parser("backtest", help="Replay stored history to evaluate weights and alerts")
+    backtest_parser.add_argument("--water-levels", help="Gauge history CSV (default: <history_dir>/water_levels.csv)")
+    backtest_parser.add_argument("--weather", help="Hourly weather history CSV (default: <history_dir>/weather.csv)")
+    backtest_parser.add_argument("--locations", help="Locations CSV (default: sample locations)")
+    backtest_parser.add_argument(
+        "--threshold", default="C", choices=[g.value for g in RiskGrade], help="Alert grade (default: C)"
+    )
+    backtest_parser.add_argument("--max-episodes", type=int, default=20, help="Episodes listed per location")
+    backtest_parser.add_argument("--grid-search", action="store_true", help="Search weight combinations")
+    backtest_parser.add_argument("--step", type=float, default=0.05, help="Weight grid step (default: 0.05)")
+    backtest_parser.add_argument("--workers", type=int, default=None, help="Grid search processes (default: CPU count)")
+    backtest_parser.add_argument("--top", type=int, default=10, help="Weight sets to show (default: 10)")
+    backtest_parser.set_defaults(handler=backtest)
+
+    table_parser = commands.add_parser("grid-table", help="Build the NWS grid cell lookup table")
+    table_parser.add_argument("output", help="Output .json path (set NWS_GRID_TABLE_PATH to use it)")
+    table_parser.add_argument("--step", type=float, default=0.01, help="Lattice spacing in degrees (default: 0.01)")
+    table_parser.add_argument(
+        "--concurrency", type=int, default=4, help="Max concurrent /points requests (default: 4)"
+    )
+    table_parser.set_defaults(handler=grid_table)
+
+    boot_parser = commands.add_parser("boot-check", help="Check app import time against the boot budget")
+    boot_parser.add_argument("--budget-ms", type=int, default=None, help="Budget (default: BOOT_BUDGET_MS)")
+    boot_parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to time (default: 5)")
+    boot_parser.set_defaults(handler=boot_check)
+
+    return parser
+
+
+async def _run(args: argparse.Namespace) -> int:
+    try:
+        return await args.handler(args)
+    finally:
+        await close_client()
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    # Results and progress go to stdout/stderr; keep service logs out of stdout
+    log.set_stream(sys.stderr)
+    return asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""
+Response compression with gzip and (when installed) brotli.
+
+Two paths:
+  - `PrecompressedBody` holds a serialized payload that many clients share
+    (the dashboard, tide data per station). Each encoding is compressed at
+    most once, at a high level, and `respond` picks the variant the client
+    accepts.
+  - `CompressionMiddleware` compresses other one-shot responses per request
+    at a fast level. Bodies under `compression_min_bytes`, streams (SSE) and
+    responses that are already encoded pass through untouched.
+
+Brotli is in requirements.txt but still looked up lazily; where it is
+missing only gzip is offered.
+"""
+
+import functools
+import gzip
+from typing import Optional
+
+from fastapi import Request, Response
+
+from app.config import settings
+
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+
+
+@functools.cache
+def _brotli():
+    # Looked up on the first compressible response rather than at boot
+    try:
+        import brotli
+        return brotli
+    except ImportError:
+        return None
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Supported encoding with the highest q-value (brotli on a tie), or None."""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip()] = q
+
+    best, best_q = None, 0.0
+    for encoding in ("br", "gzip"):
+        if encoding == "br" and _brotli() is None:
+            continue
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(body: bytes, encoding: str, shared: bool = False) -> bytes:
+    """Compress `body`; shared payloads are worth the slower, smaller levels."""
+    if encoding == "br":
+        return _brotli().compress(body, quality=settings.brotli_shared_quality if shared else settings.brotli_quality)
+    return gzip.compress(body, compresslevel=settings.gzip_shared_level if shared else settings.gzip_level)
+
+
+class PrecompressedBody:
+    """A serialized payload plus its compressed variants, each built on first use."""
+
+    __slots__ = ("body", "_variants")
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self._variants: dict[str, bytes] = {}
+
+    def variant(self, encoding: Optional[str]) -> bytes:
+        if encoding is None or len(self.body) < settings.compression_min_bytes:
+            return self.body
+        data = self._variants.get(encoding)
+        if data is None:
+            data = self._variants[encoding] = compress(self.body, encoding, shared=True)
+        return data
+
+
+def respond(
+    request: Request,
+    payload: PrecompressedBody,
+    media_type: str = "application/json",
+    headers: Optional[dict[str, str]] = None,
+) -> Response:
+    """Serve a shared payload in the best encoding the client accepts."""
+    encoding = choose_encoding(request.headers.get("accept-encoding", ""))
+    content = payload.variant(encoding)
+    headers = {**(headers or {}), "Vary": "Accept-Encoding"}
+    if content is not payload.body:
+        headers["Content-Encoding"] = encoding
+    return Response(content=content, media_type=media_type, headers=headers)
+
+
+class CompressionMiddleware:
+    """Per-request compression of single-message responses above the size threshold."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        accept = ""
+        for name, value in scope.get("headers", ()):
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        encoding = choose_encoding(accept)
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        start_message = None
+
+        async def send_compressed(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                # Hold the headers until the body shows whether to compress
+                start_message = message
+                return
+            if start_message is None:
+                return await send(message)
+
+            start, start_message = start_message, None
+            body = message.get("body", b"")
+            headers = start.get("headers", [])
+            if (
+                message.get("more_body", False)
+                or len(body) < settings.compression_min_bytes
+                or not _compressible(headers)
+            ):
+                await send(start)
+                return await send(message)
+
+            body = compress(body, encoding)
+            headers = [(k, v) for k, v in headers if k.lower() != b"content-length"]
+            headers += [
+                (b"content-encoding", encoding.encode()),
+                (b"content-length", str(len(body)).encode()),
+                (b"vary", b"Accept-Encoding"),
+            ]
+            await send({**start, "headers": headers})
+            await send({**message, "body": body})
+
+        await self.app(scope, receive, send_compressed)
+
+
+def _compressible(headers) -> bool:
+    content_type = ""
+    for name, value in headers:
+        name = name.lower()
+        if name == b"content-encoding":
+            return False
+        if name == b"content-type":
+            content_type = value.decode("latin-1").lower()
+    return content_type.startswith(COMPRESSIBLE_TYPES) and not content_type.startswith("text/event-stream")
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List
 
 
 class Settings(BaseSettings):
@@ -7,9 +7,11 @@ class Settings(BaseSettings):
     app_env: str = "development"
     cors_origins: str = "*"
 
-    # NOAA - Sewells Point, Norfolk VA
+    # NOAA - Sewells Point, Norfolk VA (default station; see services/stations.py)
     noaa_station_id: str = "8638610"
     noaa_base_url: str = "https://api.tidesandcurrents.noaa.gov/api/prod/datagetter"
+    tide_blend_stations: int = 1  # >1 blends current levels of the nearest gauges
+    tide_blend_radius_m: float = 15000.0
 
     # National Weather Service
     nws_base_url: str = "https://api.weather.gov"
@@ -17,15 +19,62 @@ class Settings(BaseSettings):
     nws_office: str = "AKQ"
     nws_grid_x: int = 89
     nws_grid_y: int = 76
+    # Local lat/lon -> grid cell table (see services/nws_grid.py)
+    nws_grid_table_path: str = ""  # Optional table from `python -m app.cli grid-table`
+    nws_grid_table_step_deg: float = 0.005
+    nws_cache_size: int = 512  # Forecasts cached per grid cell
+    nws_prefetch_concurrency: int = 4
+    nws_hourly_hours: int = 168  # Length of the hourly series kept per cell
 
     # USGS Elevation
     usgs_elevation_url: str = "https://epqs.nationalmap.gov/v1/json"
 
+    # Memoized risk scores per data generation
+    risk_cache_size: int = 4096
+    risk_cache_elevation_step_ft: float = 0.1
+
+    # Live feed (SSE / WebSocket)
+    live_refresh_seconds: int = 60
+    live_heartbeat_seconds: int = 15
+    live_queue_size: int = 4  # Messages buffered per connection
+    live_max_connections: int = 10000
+
+    # Startup - in fast-boot mode cache warmup runs after the server is up
+    fast_boot: bool = True
+    boot_budget_ms: int = 2000  # Checked by `python -m app.cli boot-check`
+
+    # Logging - JSON lines written by a background thread (see app/log.py)
+    log_level: str = "info"
+    log_queue_size: int = 10000
+    log_rate_window_seconds: float = 60.0
+    log_rate_burst: int = 10  # Entries per event per window; the rest are counted
+
+    # Response compression (gzip, plus brotli when installed)
+    compression_min_bytes: int = 1024  # Smaller bodies go out uncompressed
+    gzip_level: int = 5  # Per-request compression
+    brotli_quality: int = 4
+    gzip_shared_level: int = 9  # Payloads compressed once and shared
+    brotli_shared_quality: int = 9  # 11 is ~10x slower for a few % smaller
+
+    # Upstream record/replay (see services/upstream_archive.py)
+    http_mode: str = "live"  # live | record | replay
+    http_archive_path: str = "data/upstream.jsonl.gz"
+    replay_speed: float = 1.0  # >1 plays the recording faster (clock and latency)
+    replay_latency: bool = True  # Wait out each response's recorded latency
+    replay_time_shift: bool = True  # Move body timestamps so the recording reads as now
+    replay_start_offset_s: float = 0.0  # Start this far into the recording
+    replay_window_params: str = "begin_date,end_date"  # Matched on their span, not their values
+    replay_ignore_params: str = ""  # Not part of the match key
+
     # Twilio
     twilio_account_sid: str = ""
     twilio_auth_token: str = ""
     twilio_from_number: str = ""
 
+    # Admin endpoints require X-Admin-Token; they are disabled while this is empty
+    admin_token: str = ""
+    area_alert_concurrency: int = 16  # Subscribers scored (and alerted) at once
+
     # Norfolk reference values
     norfolk_lat: float = 36.8508
     norfolk_lon: float = -76.2859
@@ -33,6 +82,31 @@ class Settings(BaseSettings):
     tidal_max_ft: float = 7.5  # Historical max tide level at Sewells Point
     precip_threshold_in: float = 3.0  # Inches of rain that cause concern
 
+    # NWS coastal flood thresholds at Sewells Point (ft above MLLW)
+    flood_stage_minor_ft: float = 4.5
+    flood_stage_moderate_ft: float = 5.5
+    flood_stage_major_ft: float = 6.5
+    # Other gauges' thresholds as JSON: {"<station id>": [minor, moderate, major]}
+    station_flood_stages: Dict[str, List[float]] = {}
+
+    # Lead-time alerts ahead of predicted flood-stage crossings
+    tide_alert_lead_minutes: int = 120
+    alert_timezone: str = "America/New_York"  # For times in alert messages
+
+    # Backtesting - locally stored history and the rain window used as "forecast"
+    history_dir: str = "data/history"
+    precip_window_hours: int = 24
+
+    # Ensemble risk mode - draws and 1-sigma uncertainty of each perturbed input
+    ensemble_draws: int = 10000
+    ensemble_water_level_sigma_ft: float = 0.3
+    ensemble_missing_water_level_sigma_ft: float = 1.5  # No current observation
+    ensemble_precip_sigma_frac: float = 0.6  # Relative; precip amount is a heuristic
+    ensemble_wind_speed_sigma_mph: float = 5.0
+    ensemble_wind_direction_sigma_deg: float = 22.5
+    ensemble_elevation_sigma_ft: float = 1.0
+    ensemble_default_elevation_sigma_ft: float = 4.0  # Fallback elevation, USGS unavailable
+
     @property
     def cors_origin_list(self) -> List[str]:
         return [o.strip() for o in self.cors_origins.split(",")]
@@ -0,0 +1,360 @@
+"""
+TideWatch Backtesting
+
+Replays the risk formula over locally stored history to check the factor
+weights and grade cutoffs against past floods.
+
+History files (CSV; a .npz cache is written alongside on first load):
+  water levels - 6-minute gauge observations with `time` and
+                 `water_level_ft` columns (NOAA CSV exports with
+                 "Date Time" / "Water Level" headers also load)
+  weather      - hourly observations with `time`, `precipitation_in`,
+                 `wind_speed_mph` and `wind_direction` (degrees or compass)
+
+Observed rain over the following `precip_window_hours` stands in for the
+forecast amount the live engine uses (a perfect forecast). A step counts as
+flooding when the gauge is at or above minor flood stage.
+"""
+
+import csv
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Iterator, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from app.config import settings
+from app.engine.risk_engine import DEFAULT_DIRECTION_MULTIPLIER
+from app.engine.vectorized import (
+    DEFAULT_WEIGHTS,
+    DEFAULT_CUTOFFS,
+    GRADE_ORDER,
+    direction_to_degrees,
+    direction_multipliers,
+    tidal_factors,
+    elevation_factors,
+    precipitation_factors,
+    wind_factors,
+    to_scores,
+)
+from app.models.schemas import (
+    RiskGrade,
+    AlertEpisode,
+    LocationBacktest,
+    BacktestMetrics,
+)
+
+WEIGHT_NAMES = ("tidal", "elevation", "precipitation", "wind")
+
+
+class History(NamedTuple):
+    """Gauge history with weather aligned to each 6-minute step."""
+    times: np.ndarray  # int64 epoch seconds (UTC)
+    water_level_ft: np.ndarray
+    precipitation_in: np.ndarray  # Rain over the following precip window
+    wind_speed_mph: np.ndarray
+    wind_direction_deg: np.ndarray  # NaN when unknown
+
+
+class Location(NamedTuple):
+    name: str
+    latitude: float
+    longitude: float
+    elevation_ft: float
+
+
+# --- Loading ---
+
+
+def _parse_time(value: str) -> int:
+    dt = datetime.fromisoformat(value.strip())
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+def _parse_float(value: str) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _parse_direction(value: str) -> float:
+    degrees = _parse_float(value)
+    if math.isnan(degrees):
+        compass = direction_to_degrees(value or "")
+        return math.nan if compass is None else compass
+    return degrees
+
+
+def _read_columns(path: str, columns: dict[str, tuple[str, ...]]) -> dict[str, list[str]]:
+    """Read the named columns of a CSV, accepting any of several header aliases."""
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = [h.strip().lower() for h in next(reader)]
+        index = {}
+        for name, aliases in columns.items():
+            found = next((header.index(a) for a in aliases if a in header), None)
+            if found is None:
+                raise ValueError(f"{path}: missing column {name!r}")
+            index[name] = found
+
+        out: dict[str, list[str]] = {name: [] for name in columns}
+        for row in reader:
+            if not row:
+                continue
+            for name, i in index.items():
+                out[name].append(row[i] if i < len(row) else "")
+        return out
+
+
+def _cached(path: str, loader) -> dict[str, np.ndarray]:
+    """Load arrays from `path`.npz when it is newer than the CSV; refresh it otherwise."""
+    cache_path = path + ".npz"
+    if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(path):
+        with np.load(cache_path) as data:
+            return {k: data[k] for k in data.files}
+    arrays = loader(path)
+    np.savez(cache_path, **arrays)
+    return arrays
+
+
+def _load_water_levels(path: str) -> dict[str, np.ndarray]:
+    cols = _read_columns(path, {
+        "time": ("time", "date time", "t"),
+        "water_level_ft": ("water_level_ft", "water level", "v"),
+    })
+    times = np.array([_parse_time(t) for t in cols["time"]], dtype=np.int64)
+    levels = np.array([_parse_float(v) for v in cols["water_level_ft"]])
+
+    keep = ~np.isnan(levels)
+    order = np.argsort(times[keep], kind="stable")
+    return {"times": times[keep][order], "water_level_ft": levels[keep][order]}
+
+
+def _load_weather(path: str) -> dict[str, np.ndarray]:
+    cols = _read_columns(path, {
+        "time": ("time", "date time", "t"),
+        "precipitation_in": ("precipitation_in", "precipitation"),
+        "wind_speed_mph": ("wind_speed_mph", "wind speed"),
+        "wind_direction": ("wind_direction", "wind direction"),
+    })
+    times = np.array([_parse_time(t) for t in cols["time"]], dtype=np.int64)
+    precip = np.nan_to_num(np.array([_parse_float(v) for v in cols["precipitation_in"]]))
+    wind = np.nan_to_num(np.array([_parse_float(v) for v in cols["wind_speed_mph"]]))
+    direction = np.array([_parse_direction(v) for v in cols["wind_direction"]])
+
+    order = np.argsort(times, kind="stable")
+    return {
+        "times": times[order],
+        "precipitation_in": precip[order],
+        "wind_speed_mph": wind[order],
+        "wind_direction_deg": direction[order],
+    }
+
+
+def load_history(
+    water_level_path: Optional[str] = None,
+    weather_path: Optional[str] = None,
+    precip_window_hours: Optional[int] = None,
+) -> History:
+    """Load gauge and weather history and align the weather to each gauge step."""
+    water_level_path = water_level_path or os.path.join(settings.history_dir, "water_levels.csv")
+    weather_path = weather_path or os.path.join(settings.history_dir, "weather.csv")
+    window_s = (precip_window_hours or settings.precip_window_hours) * 3600
+
+    gauge = _cached(water_level_path, _load_water_levels)
+    wx = _cached(weather_path, _load_weather)
+    times = gauge["times"]
+
+    # Rain in [t, t + window) via a cumulative sum
+    cumulative = np.concatenate(([0.0], np.cumsum(wx["precipitation_in"])))
+    lo = np.searchsorted(wx["times"], times, side="left")
+    hi = np.searchsorted(wx["times"], times + window_s, side="left")
+    precipitation = cumulative[hi] - cumulative[lo]
+
+    # Wind from the latest observation at or before each step
+    if len(wx["times"]):
+        idx = np.searchsorted(wx["times"], times, side="right") - 1
+        has_obs = idx >= 0
+        idx = np.maximum(idx, 0)
+        wind = np.where(has_obs, wx["wind_speed_mph"][idx], 0.0)
+        direction = np.where(has_obs, wx["wind_direction_deg"][idx], np.nan)
+    else:
+        wind = np.zeros(len(times))
+        direction = np.full(len(times), np.nan)
+
+    return History(times, gauge["water_level_ft"], precipitation, wind, direction)
+
+
+# --- Replay ---
+
+
+def _time_factors(history: History) -> np.ndarray:
+    """Tidal, precipitation and wind factors per step, shape (3, steps)."""
+    known = ~np.isnan(history.wind_direction_deg)
+    dir_mult = np.where(
+        known,
+        direction_multipliers(np.nan_to_num(history.wind_direction_deg)),
+        DEFAULT_DIRECTION_MULTIPLIER,
+    )
+    return np.stack([
+        tidal_factors(history.water_level_ft),
+        precipitation_factors(history.precipitation_in),
+        wind_factors(history.wind_speed_mph, dir_mult),
+    ])
+
+
+def _flood_mask(history: History) -> np.ndarray:
+    return history.water_level_ft >= settings.flood_stage_minor_ft
+
+
+def _alert_cutoff(threshold: RiskGrade, cutoffs: Sequence[float]) -> float:
+    """Score a step must exceed to reach `threshold`; -inf when every grade alerts."""
+    index = GRADE_ORDER.index(threshold)
+    return -math.inf if index == 0 else cutoffs[index - 1]
+
+
+def _episodes(mask: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Start (inclusive) and end (exclusive) indices of runs of True."""
+    edges = np.diff(np.concatenate(([0], mask.view(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def _to_datetime(epoch: int) -> datetime:
+    return datetime.fromtimestamp(int(epoch), tz=timezone.utc).replace(tzinfo=None)
+
+
+def replay(
+    history: History,
+    locations: Sequence[Location],
+    weights: Sequence[float] = DEFAULT_WEIGHTS,
+    threshold: RiskGrade = RiskGrade.C,
+    cutoffs: Sequence[float] = DEFAULT_CUTOFFS,
+) -> tuple[list[LocationBacktest], BacktestMetrics]:
+    """
+    Score every location at every step in one pass and report when alerts
+    at or above `threshold` would have fired.
+    """
+    w_tidal, w_elevation, w_precip, w_wind = weights
+    time_raw = np.tensordot(np.array([w_tidal, w_precip, w_wind]), _time_factors(history), axes=1)
+    elev = elevation_factors(np.array([loc.elevation_ft for loc in locations]))
+    scores = to_scores(time_raw[np.newaxis, :] + w_elevation * elev[:, np.newaxis])
+    alerts = scores > _alert_cutoff(threshold, cutoffs)
+
+    results = []
+    for loc, loc_scores, loc_alerts in zip(locations, scores, alerts):
+        starts, ends = _episodes(loc_alerts)
+        # Each segment from one start to the next holds exactly one episode,
+        # and non-alerting steps score lower, so the segment max is the peak
+        peaks = np.maximum.reduceat(loc_scores, starts) if len(starts) else np.empty(0)
+        results.append(
+            LocationBacktest(
+                name=loc.name,
+                elevation_ft=loc.elevation_ft,
+                alert_steps=int(loc_alerts.sum()),
+                episodes=[
+                    AlertEpisode(
+                        start=_to_datetime(history.times[s]),
+                        end=_to_datetime(history.times[e - 1]),
+                        peak_score=float(p),
+                    )
+                    for s, e, p in zip(starts, ends, peaks)
+                ],
+            )
+        )
+
+    metrics = _metrics(weights, alerts, _flood_mask(history))
+    return results, metrics
+
+
+def _metrics(weights: Sequence[float], alerts: np.ndarray, flood: np.ndarray) -> BacktestMetrics:
+    """Contingency counts over every (location, step) pair against the gauge flood mask."""
+    hits = int(np.count_nonzero(alerts & flood))
+    alert_steps = int(np.count_nonzero(alerts))
+    flood_steps = int(np.count_nonzero(flood)) * alerts.shape[0]
+    misses = flood_steps - hits
+    false_alarms = alert_steps - hits
+    rising = alerts[:, 1:] & ~alerts[:, :-1]
+    episodes = int(np.count_nonzero(rising) + np.count_nonzero(alerts[:, 0]))
+
+    return BacktestMetrics(
+        weights={name: round(float(w), 4) for name, w in zip(WEIGHT_NAMES, weights)},
+        alert_steps=alert_steps,
+        alert_episodes=episodes,
+        hits=hits,
+        misses=misses,
+        false_alarms=false_alarms,
+        pod=round(hits / (hits + misses), 4) if hits + misses else 0.0,
+        far=round(false_alarms / alert_steps, 4) if alert_steps else 0.0,
+        csi=round(hits / (hits + misses + false_alarms), 4) if hits + misses + false_alarms else 0.0,
+    )
+
+
+# --- Weight grid search ---
+
+_worker_state: dict = {}
+
+
+def _init_grid_worker(time_factors: np.ndarray, elev: np.ndarray, flood: np.ndarray, cutoff: float):
+    _worker_state.update(time_factors=time_factors, elev=elev, flood=flood, cutoff=cutoff)
+
+
+def _evaluate_weights(weight_sets: list[tuple[float, ...]]) -> list[BacktestMetrics]:
+    time_factors = _worker_state["time_factors"]
+    elev = _worker_state["elev"]
+    flood = _worker_state["flood"]
+    # Scores are rounded to 0.1, so "score > cutoff" is "raw > cutoff + 0.05"
+    # (up to float rounding right at the boundary)
+    raw_cutoff = (_worker_state["cutoff"] + 0.05) / 100
+
+    results = []
+    for weights in weight_sets:
+        w_tidal, w_elevation, w_precip, w_wind = weights
+        time_raw = w_tidal * time_factors[0] + w_precip * time_factors[1] + w_wind * time_factors[2]
+        # Compare the shared time series against a per-location cutoff instead
+        # of materializing scores for every location
+        alerts = time_raw[np.newaxis, :] > (raw_cutoff - w_elevation * elev)[:, np.newaxis]
+        results.append(_metrics(weights, alerts, flood))
+    return results
+
+
+def weight_grid(step: float = 0.05) -> Iterator[tuple[float, ...]]:
+    """All (tidal, elevation, precipitation, wind) weights that are multiples of `step` and sum to 1."""
+    n = round(1 / step)
+    for a in range(1, n):
+        for b in range(1, n - a):
+            for c in range(1, n - a - b):
+                d = n - a - b - c
+                yield (a * step, b * step, c * step, d * step)
+
+
+def grid_search(
+    history: History,
+    locations: Sequence[Location],
+    step: float = 0.05,
+    threshold: RiskGrade = RiskGrade.C,
+    cutoffs: Sequence[float] = DEFAULT_CUTOFFS,
+    workers: Optional[int] = None,
+    batch_size: int = 32,
+) -> list[BacktestMetrics]:
+    """Evaluate every weight combination across a process pool, best CSI first."""
+    time_factors = _time_factors(history).astype(np.float32)
+    elev = elevation_factors(np.array([loc.elevation_ft for loc in locations])).astype(np.float32)
+    flood = _flood_mask(history)
+    cutoff = _alert_cutoff(threshold, cutoffs)
+
+    combos = list(weight_grid(step))
+    batches = [combos[i:i + batch_size] for i in range(0, len(combos), batch_size)]
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_grid_worker,
+        initargs=(time_factors, elev, flood, cutoff),
+    ) as pool:
+        results = [m for batch in pool.map(_evaluate_weights, batches) for m in batch]
+
+    return sorted(results, key=lambda m: (m.csi, m.pod), reverse=True)
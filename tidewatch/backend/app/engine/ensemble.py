@@ -0,0 +1,87 @@
+"""
+TideWatch Ensemble Risk Mode
+
+Instead of a single deterministic score, perturbs each input within its
+uncertainty band and scores every draw in one vectorized pass:
+  - water level: normal, sigma in ft (wider when no observation is available)
+  - precipitation: mean-preserving lognormal, since the forecast amount is a
+    coarse estimate derived from probability of precipitation
+  - wind speed: normal, sigma in mph, floored at zero
+  - wind direction: normal, sigma in degrees (only when a direction is known)
+  - elevation: normal, sigma in ft (wider for the default fallback elevation)
+
+The spread of resulting scores gives percentiles and per-grade probabilities.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+from app.config import settings
+from app.engine.risk_engine import DEFAULT_TIDAL_FACTOR, DEFAULT_DIRECTION_MULTIPLIER
+from app.engine.vectorized import (
+    GRADE_ORDER,
+    direction_to_degrees,
+    direction_multipliers,
+    risk_scores,
+    grade_indices,
+)
+from app.models.schemas import EnsembleRisk, TideData, WeatherData, ElevationData
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def calculate_risk_ensemble(
+    tide: TideData,
+    weather: WeatherData,
+    elevation: ElevationData,
+    draws: Optional[int] = None,
+    seed: Optional[int] = None,
+) -> EnsembleRisk:
+    """Score `draws` perturbed copies of the inputs and summarize the distribution."""
+    n = draws or settings.ensemble_draws
+    rng = np.random.default_rng(seed)
+    noise = rng.standard_normal((5, n))
+
+    # Water level
+    if tide.current is not None:
+        level = tide.current.water_level_ft + settings.ensemble_water_level_sigma_ft * noise[0]
+    else:
+        level = (
+            DEFAULT_TIDAL_FACTOR * settings.tidal_max_ft
+            + settings.ensemble_missing_water_level_sigma_ft * noise[0]
+        )
+
+    # Precipitation (lognormal keeps draws non-negative with the same mean)
+    sigma_p = settings.ensemble_precip_sigma_frac
+    precip = weather.precipitation_forecast_in * np.exp(sigma_p * noise[1] - 0.5 * sigma_p**2)
+
+    # Wind speed and direction
+    wind = np.maximum(weather.wind_speed_mph + settings.ensemble_wind_speed_sigma_mph * noise[2], 0.0)
+    degrees = direction_to_degrees(weather.wind_direction)
+    if degrees is not None:
+        dir_mult = direction_multipliers(degrees + settings.ensemble_wind_direction_sigma_deg * noise[3])
+    else:
+        dir_mult = DEFAULT_DIRECTION_MULTIPLIER
+
+    # Elevation
+    sigma_e = (
+        settings.ensemble_default_elevation_sigma_ft
+        if elevation.source.startswith("default")
+        else settings.ensemble_elevation_sigma_ft
+    )
+    elev = elevation.elevation_ft + sigma_e * noise[4]
+
+    scores = risk_scores(level, elev, precip, wind, dir_mult)
+    counts = np.bincount(grade_indices(scores), minlength=len(GRADE_ORDER))
+    pct = np.percentile(scores, PERCENTILES)
+
+    return EnsembleRisk(
+        draws=n,
+        mean=round(float(scores.mean()), 1),
+        std=round(float(scores.std()), 2),
+        percentiles={f"p{p}": round(float(v), 1) for p, v in zip(PERCENTILES, pct)},
+        grade_probabilities={
+            grade.value: round(float(c) / n, 4) for grade, c in zip(GRADE_ORDER, counts)
+        },
+    )
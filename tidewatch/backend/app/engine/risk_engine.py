@@ -30,6 +30,41 @@ W_ELEVATION = 0.30
 W_PRECIPITATION = 0.20
 W_WIND = 0.15
 
+# Upper score bound (inclusive) for each grade; anything above the last is F
+GRADE_CUTOFFS = (
+    (20, RiskGrade.A),
+    (40, RiskGrade.B),
+    (60, RiskGrade.C),
+    (80, RiskGrade.D),
+)
+
+# Direction multiplier - NE/E winds push water up the Chesapeake toward Norfolk
+WIND_DIRECTION_MULTIPLIERS = {
+    "NE": 1.0,
+    "ENE": 0.95,
+    "E": 0.9,
+    "N": 0.7,
+    "NNE": 0.85,
+    "ESE": 0.7,
+    "SE": 0.5,
+    "S": 0.3,
+    "SSE": 0.4,
+    "SSW": 0.2,
+    "SW": 0.2,
+    "W": 0.1,
+    "NW": 0.3,
+    "NNW": 0.4,
+    "WNW": 0.15,
+    "WSW": 0.15,
+}
+DEFAULT_DIRECTION_MULTIPLIER = 0.5
+
+# Wind speed at which the speed component saturates (tropical storm force)
+WIND_SATURATION_MPH = 60.0
+
+# Tidal factor used when no water level observation is available
+DEFAULT_TIDAL_FACTOR = 0.3
+
 
 def _clamp(value: float, low: float = 0.0, high: float = 1.0) -> float:
     return max(low, min(high, value))
@@ -38,7 +73,7 @@ def _clamp(value: float, low: float = 0.0, high: float = 1.0) -> float:
 def _compute_tidal_factor(tide: TideData) -> float:
     """Normalize current water level against historical max."""
     if tide.current is None:
-        return 0.3  # Moderate default if data unavailable
+        return DEFAULT_TIDAL_FACTOR  # Moderate default if data unavailable
     level = tide.current.water_level_ft
     return _clamp(level / settings.tidal_max_ft)
 
@@ -68,43 +103,19 @@ def _compute_wind_surge_factor(weather: WeatherData) -> float:
     direction = weather.wind_direction.upper()
 
     # Base factor from wind speed (tropical storm force = 1.0)
-    speed_factor = _clamp(wind_mph / 60.0)
+    speed_factor = _clamp(wind_mph / WIND_SATURATION_MPH)
 
     # Direction multiplier - NE/E winds are worst for Norfolk
-    direction_multipliers = {
-        "NE": 1.0,
-        "ENE": 0.95,
-        "E": 0.9,
-        "N": 0.7,
-        "NNE": 0.85,
-        "ESE": 0.7,
-        "SE": 0.5,
-        "S": 0.3,
-        "SSE": 0.4,
-        "SSW": 0.2,
-        "SW": 0.2,
-        "W": 0.1,
-        "NW": 0.3,
-        "NNW": 0.4,
-        "WNW": 0.15,
-        "WSW": 0.15,
-    }
-    dir_mult = direction_multipliers.get(direction, 0.5)
+    dir_mult = WIND_DIRECTION_MULTIPLIERS.get(direction, DEFAULT_DIRECTION_MULTIPLIER)
 
     return _clamp(speed_factor * dir_mult)
 
 
 def _score_to_grade(score: float) -> RiskGrade:
-    if score <= 20:
-        return RiskGrade.A
-    elif score <= 40:
-        return RiskGrade.B
-    elif score <= 60:
-        return RiskGrade.C
-    elif score <= 80:
-        return RiskGrade.D
-    else:
-        return RiskGrade.F
+    for cutoff, grade in GRADE_CUTOFFS:
+        if score <= cutoff:
+            return grade
+    return RiskGrade.F
 
 
 def _generate_summary(grade: RiskGrade, factors: RiskFactors) -> str:
@@ -0,0 +1,127 @@
+"""
+Vectorized form of the TideWatch risk formula.
+
+Evaluates the same composite score as `calculate_risk`, but over NumPy arrays
+so that ensembles, backtests and bulk scoring can score thousands of inputs
+in a single pass:
+  R = w1*(T/Tmax) + w2*(1 - E/Eref) + w3*(P/Pthresh) + w4*S_wind
+"""
+
+from typing import Optional, Sequence
+
+import numpy as np
+
+from app.config import settings
+from app.engine.risk_engine import (
+    W_TIDAL,
+    W_ELEVATION,
+    W_PRECIPITATION,
+    W_WIND,
+    GRADE_CUTOFFS,
+    WIND_DIRECTION_MULTIPLIERS,
+    DEFAULT_DIRECTION_MULTIPLIER,
+    WIND_SATURATION_MPH,
+)
+from app.models.schemas import RiskGrade
+
+DEFAULT_WEIGHTS = (W_TIDAL, W_ELEVATION, W_PRECIPITATION, W_WIND)
+DEFAULT_CUTOFFS = tuple(cutoff for cutoff, _ in GRADE_CUTOFFS)
+
+# Grades in severity order; index matches the output of `grade_indices`
+GRADE_ORDER = tuple(grade for _, grade in GRADE_CUTOFFS) + (RiskGrade.F,)
+
+# 16-point compass, clockwise from north in 22.5° sectors
+COMPASS_POINTS = (
+    "N", "NNE", "NE", "ENE", "E", "ESE", "SE", "SSE",
+    "S", "SSW", "SW", "WSW", "W", "WNW", "NW", "NNW",
+)
+SECTOR_DEGREES = 360.0 / len(COMPASS_POINTS)
+
+_SECTOR_MULTIPLIERS = np.array(
+    [WIND_DIRECTION_MULTIPLIERS.get(p, DEFAULT_DIRECTION_MULTIPLIER) for p in COMPASS_POINTS]
+)
+
+
+def direction_to_degrees(direction: str) -> Optional[float]:
+    """Convert a compass point like 'NE' to degrees; None if unrecognized."""
+    try:
+        return COMPASS_POINTS.index(direction.strip().upper()) * SECTOR_DEGREES
+    except ValueError:
+        return None
+
+
+def direction_multipliers(degrees: np.ndarray) -> np.ndarray:
+    """Map wind directions in degrees to the surge multiplier of their compass sector."""
+    sector = np.rint(np.mod(degrees, 360.0) / SECTOR_DEGREES).astype(np.intp) % len(COMPASS_POINTS)
+    return _SECTOR_MULTIPLIERS[sector]
+
+
+def tidal_factors(water_level_ft: np.ndarray) -> np.ndarray:
+    return np.clip(np.asarray(water_level_ft) / settings.tidal_max_ft, 0.0, 1.0)
+
+
+def elevation_factors(elevation_ft: np.ndarray) -> np.ndarray:
+    # Elevations at or below sea level clip to maximum risk, as in the scalar engine
+    return np.clip(1.0 - np.asarray(elevation_ft) / settings.reference_elevation_ft, 0.0, 1.0)
+
+
+def precipitation_factors(precipitation_in: np.ndarray) -> np.ndarray:
+    return np.clip(np.asarray(precipitation_in) / settings.precip_threshold_in, 0.0, 1.0)
+
+
+def wind_factors(wind_speed_mph: np.ndarray, direction_multiplier: np.ndarray) -> np.ndarray:
+    speed = np.clip(np.asarray(wind_speed_mph) / WIND_SATURATION_MPH, 0.0, 1.0)
+    return np.clip(speed * direction_multiplier, 0.0, 1.0)
+
+
+def risk_factors(
+    water_level_ft: np.ndarray,
+    elevation_ft: np.ndarray,
+    precipitation_in: np.ndarray,
+    wind_speed_mph: np.ndarray,
+    direction_multiplier: np.ndarray,
+) -> np.ndarray:
+    """
+    Normalized tidal, elevation, precipitation and wind factors, stacked on a
+    new leading axis of length 4.
+
+    Inputs broadcast against each other, so a scalar elevation can be scored
+    against a whole water level series (or a column of elevations against a
+    row of time steps).
+    """
+    return np.stack(
+        np.broadcast_arrays(
+            tidal_factors(water_level_ft),
+            elevation_factors(elevation_ft),
+            precipitation_factors(precipitation_in),
+            wind_factors(wind_speed_mph, direction_multiplier),
+        )
+    )
+
+
+def to_scores(raw: np.ndarray) -> np.ndarray:
+    """Scale weighted 0-1 composites to rounded 0-100 scores."""
+    return np.round(np.clip(raw, 0.0, 1.0) * 100, 1)
+
+
+def combine_factors(factors: np.ndarray, weights: Sequence[float] = DEFAULT_WEIGHTS) -> np.ndarray:
+    """Weight stacked factors into scores on the 0-100 scale."""
+    return to_scores(np.tensordot(np.asarray(weights, dtype=factors.dtype), factors, axes=1))
+
+
+def risk_scores(
+    water_level_ft: np.ndarray,
+    elevation_ft: np.ndarray,
+    precipitation_in: np.ndarray,
+    wind_speed_mph: np.ndarray,
+    direction_multiplier: np.ndarray,
+    weights: Sequence[float] = DEFAULT_WEIGHTS,
+) -> np.ndarray:
+    """Score arrays of inputs on the 0-100 scale (see `risk_factors` for broadcasting)."""
+    factors = risk_factors(water_level_ft, elevation_ft, precipitation_in, wind_speed_mph, direction_multiplier)
+    return combine_factors(factors, weights)
+
+
+def grade_indices(scores: np.ndarray, cutoffs: Sequence[float] = DEFAULT_CUTOFFS) -> np.ndarray:
+    """Map scores to indices into GRADE_ORDER (0 = A ... 4 = F)."""
+    return np.searchsorted(np.asarray(cutoffs, dtype=float), scores, side="left")
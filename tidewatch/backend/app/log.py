@@ -0,0 +1,206 @@
+"""
+Structured, non-blocking logging.
+
+    from app import log
+    log.warning("noaa.water_level_failed", station=station.id, error=str(e))
+
+Each call builds a small dict and puts it on a bounded queue; a background
+thread serializes entries as JSON lines and writes them out, so the event
+loop never blocks on stdout. If the writer falls behind, new entries are
+dropped and counted rather than queued without limit.
+
+Entries carry the request id of the HTTP request or WebSocket they were
+logged from (see `RequestIdMiddleware`). Warnings and errors are rate
+limited per event name: repeats of an identical entry within a window are
+dropped, and at most `log_rate_burst` entries per event are written per
+window. The next entry written for an event reports how many were
+suppressed. Lower levels and audit events (`alerts.*`, the record of which
+messages went out) are always written.
+"""
+
+import atexit
+import contextvars
+import json
+import queue
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from app.config import settings
+
+LEVELS = {"debug": 10, "info": 20, "warning": 30, "error": 40}
+RATE_LIMITED_LEVELS = ("warning", "error")
+AUDIT_EVENT_PREFIXES = ("alerts.",)  # Never suppressed
+
+request_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+
+
+class _RateLimiter:
+    """Per-event windows; `check` returns None to drop, else the count suppressed before this entry."""
+
+    def __init__(self, window_seconds: float, burst: int):
+        self.window_seconds = window_seconds
+        self.burst = burst
+        # event -> [window start, entries written, entries suppressed, signatures seen]
+        self._windows: dict[str, list] = {}
+
+    def check(self, event: str, signature: str) -> Optional[int]:
+        now = time.monotonic()
+        window = self._windows.get(event)
+        if window is None or now - window[0] >= self.window_seconds:
+            suppressed = window[2] if window is not None else 0
+            self._windows[event] = [now, 1, 0, {signature}]
+            return suppressed
+        if window[1] >= self.burst or signature in window[3]:
+            window[2] += 1
+            return None
+        window[1] += 1
+        window[3].add(signature)
+        suppressed, window[2] = window[2], 0
+        return suppressed
+
+
+_STOP = object()
+
+_queue: queue.Queue = queue.Queue(maxsize=settings.log_queue_size)
+_limiter = _RateLimiter(settings.log_rate_window_seconds, settings.log_rate_burst)
+_threshold = LEVELS.get(settings.log_level.lower(), LEVELS["info"])
+_lock = threading.Lock()
+_writer: Optional[threading.Thread] = None
+_stream = sys.stdout
+_dropped = 0
+
+
+def _write_loop(stream):
+    while True:
+        entries = [_queue.get()]
+        # Write whatever else is already waiting in one go
+        while len(entries) < 256:
+            try:
+                entries.append(_queue.get_nowait())
+            except queue.Empty:
+                break
+        stop = any(entry is _STOP for entry in entries)
+        lines = []
+        for entry in entries:
+            if entry is _STOP:
+                continue
+            entry["ts"] = datetime.fromtimestamp(entry["ts"], tz=timezone.utc).isoformat(timespec="milliseconds")
+            lines.append(json.dumps(entry, default=str))
+        if lines:
+            try:
+                stream.write("\n".join(lines) + "\n")
+                stream.flush()
+            except Exception:
+                pass
+        if stop:
+            return
+
+
+def _ensure_writer():
+    global _writer
+    if _writer is not None:
+        return
+    with _lock:
+        if _writer is None:
+            _writer = threading.Thread(target=_write_loop, args=(_stream,), name="log-writer", daemon=True)
+            _writer.start()
+
+
+def _emit(level: str, event: str, fields: dict[str, Any]):
+    global _dropped
+    if LEVELS[level] < _threshold:
+        return
+    suppressed = 0
+    if level in RATE_LIMITED_LEVELS and not event.startswith(AUDIT_EVENT_PREFIXES):
+        suppressed = _limiter.check(event, repr(fields) if fields else "")
+        if suppressed is None:
+            return
+
+    entry = {"ts": time.time(), "level": level, "event": event}
+    rid = request_id.get()
+    if rid is not None:
+        entry["request_id"] = rid
+    entry.update(fields)
+    if suppressed:
+        entry["suppressed"] = suppressed
+    if _dropped:
+        entry["dropped"], _dropped = _dropped, 0
+
+    _ensure_writer()
+    try:
+        _queue.put_nowait(entry)
+    except queue.Full:
+        _dropped += 1
+
+
+def debug(event: str, **fields: Any):
+    _emit("debug", event, fields)
+
+
+def info(event: str, **fields: Any):
+    _emit("info", event, fields)
+
+
+def warning(event: str, **fields: Any):
+    _emit("warning", event, fields)
+
+
+def error(event: str, **fields: Any):
+    _emit("error", event, fields)
+
+
+def set_stream(stream):
+    """Write to `stream` instead of stdout (e.g. stderr for CLI tools that print results)."""
+    global _stream
+    shutdown()
+    _stream = stream
+
+
+def shutdown(timeout: float = 2.0):
+    """Flush queued entries and stop the writer thread."""
+    global _writer
+    if _writer is None:
+        return
+    try:
+        _queue.put(_STOP, timeout=timeout)
+    except queue.Full:
+        pass
+    _writer.join(timeout)
+    _writer = None
+
+
+atexit.register(shutdown)
+
+
+class RequestIdMiddleware:
+    """Tag each HTTP request and WebSocket with an id (from X-Request-ID or generated)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            return await self.app(scope, receive, send)
+
+        rid = None
+        for name, value in scope.get("headers", ()):
+            if name == b"x-request-id":
+                rid = value.decode("latin-1")[:64]
+                break
+        rid = rid or uuid.uuid4().hex[:16]
+        token = request_id.set(rid)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = [*message["headers"], (b"x-request-id", rid.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            request_id.reset(token)
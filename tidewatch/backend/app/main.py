@@ -1,40 +1,71 @@
 """TideWatch API - FastAPI application entry point."""
 
+from app import boot  # First, so startup timing covers the imports below
+
 import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app import log
+from app.compression import CompressionMiddleware
 from app.config import settings
 from app.models.schemas import HealthResponse
-from app.routers import risk_router, tide_router, weather_router, alert_router
+from app.routers import risk_router, tide_router, weather_router, alert_router, live_router, dashboard_router
+from app.services import noaa_service, notification_service, stations
+from app.services.http_client import close_client
+from app.services.live_feed import feed
+
+boot.mark("imports")
+
+_warmup_done = False
 
 
 async def _warmup_caches():
     """Pre-fetch API data on startup so first user request is fast."""
-    from app.services.noaa_service import get_current_water_level, get_tide_predictions
-    from app.services.weather_service import get_weather_data
+    global _warmup_done
+    from app.services.noaa_service import refresh_all_stations
+    from app.services.weather_service import prefetch_city_cells
     from app.services.elevation_service import get_elevation
 
-    try:
-        await asyncio.gather(
-            get_current_water_level(),
-            get_tide_predictions(48),
-            get_weather_data(),
-            get_elevation(36.8508, -76.2859),   # Norfolk center
-            return_exceptions=True,
-        )
-        print("[TideWatch] Cache warmup complete")
-    except Exception as e:
-        print(f"[TideWatch] Cache warmup partial: {e}")
+    with boot.measure("warmup"):
+        # Load the deferred modules off the event loop so requests aren't held up
+        await asyncio.to_thread(boot.preload)
+        try:
+            await asyncio.gather(
+                refresh_all_stations(),
+                prefetch_city_cells(),
+                get_elevation(36.8508, -76.2859),   # Norfolk center
+                return_exceptions=True,
+            )
+            log.info("startup.warmup_complete")
+        except Exception as e:
+            log.warning("startup.warmup_partial", error=str(e))
+    _warmup_done = True
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: warm caches in background
-    asyncio.create_task(_warmup_caches())
+    boot.mark("server")
+    # Startup: warm caches (in the background in fast-boot mode, so the port
+    # opens and the health check answers right away), keep tide stations
+    # fresh and start the live feed publisher
+    if settings.fast_boot:
+        asyncio.create_task(_warmup_caches())
+    else:
+        await _warmup_caches()
+    station_refresh = asyncio.create_task(noaa_service.run_station_refresh())
+    feed.start()
+    boot.mark("startup")
+    boot.ready()
+    log.info("startup.ready", **boot.report())
     yield
-    # Shutdown: nothing to clean up
+    # Shutdown: stop background work and release pooled connections
+    station_refresh.cancel()
+    await feed.stop()
+    notification_service.stop_scheduler()
+    await close_client()
+    log.shutdown()
 
 
 app = FastAPI(
@@ -53,11 +84,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# gzip/brotli for responses that aren't already precompressed
+app.add_middleware(CompressionMiddleware)
+
+# Request ids for log entries (echoed back as X-Request-ID)
+app.add_middleware(log.RequestIdMiddleware)
+
 # Register routers
 app.include_router(risk_router.router)
 app.include_router(tide_router.router)
 app.include_router(weather_router.router)
 app.include_router(alert_router.router)
+app.include_router(live_router.router)
+app.include_router(dashboard_router.router)
+
+boot.mark("app")
 
 
 @app.get("/", response_model=HealthResponse)
@@ -72,8 +113,9 @@ async def api_info():
         "version": "1.0.0",
         "station": {
             "id": settings.noaa_station_id,
-            "name": "Sewells Point, VA",
+            "name": stations.resolve_station().name,
         },
+        "stations": len(stations.STATIONS),
         "coverage_area": "Norfolk, VA (36.7-37.1°N, 76.1-76.5°W)",
         "data_sources": [
             "NOAA Tides & Currents",
@@ -81,3 +123,9 @@ async def api_info():
             "USGS National Elevation Dataset",
         ],
     }
+
+
+@app.get("/api/info/boot")
+async def boot_info():
+    """Measured startup phases and which deferred modules have loaded so far."""
+    return {"fast_boot": settings.fast_boot, "warm": _warmup_done, **boot.report()}
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
 from enum import Enum
 
@@ -27,6 +27,41 @@ class TideData(BaseModel):
     current: Optional[TideReading] = None
     predictions: List[TideReading] = []
     station_name: str = "Sewells Point, VA"
+    station_id: str = "8638610"
+    blend_weights: Optional[List[float]] = None  # Per gauge in station_id, when blended
+
+
+class TideStation(BaseModel):
+    id: str
+    name: str
+    latitude: float
+    longitude: float
+    refresh_seconds: int = 360  # NOAA publishes 6-minute water levels
+    flood_stages_ft: Dict[str, float] = {}  # minor/moderate/major, ft above MLLW; empty if unknown
+
+
+class TideExtreme(BaseModel):
+    kind: str  # "high" or "low"
+    time: datetime
+    height_ft: float
+
+
+class FloodInterval(BaseModel):
+    stage: str  # minor, moderate or major
+    threshold_ft: float
+    start: Optional[datetime] = None  # None: already above at the first prediction
+    end: Optional[datetime] = None  # None: still above at the last prediction
+    peak_ft: float
+    peak_time: datetime
+
+
+class TideEvents(BaseModel):
+    station_id: str
+    generated_at: datetime
+    predictions_start: datetime
+    predictions_end: datetime
+    extrema: List[TideExtreme] = []
+    flood: List[FloodInterval] = []
 
 
 # --- Weather Models ---
@@ -76,11 +111,20 @@ class RiskScore(BaseModel):
     confidence: float = Field(ge=0, le=1, default=0.7)
 
 
+class EnsembleRisk(BaseModel):
+    draws: int = Field(description="Number of perturbed input draws scored")
+    mean: float = Field(ge=0, le=100, description="Mean score across draws")
+    std: float = Field(ge=0, description="Standard deviation of scores")
+    percentiles: Dict[str, float] = Field(description="Score percentiles keyed p5, p25, p50, p75, p95")
+    grade_probabilities: Dict[str, float] = Field(description="Fraction of draws landing in each grade")
+
+
 class RiskAssessment(BaseModel):
     address: str
     latitude: float
     longitude: float
     risk: RiskScore
+    ensemble: Optional[EnsembleRisk] = None
     tide: Optional[TideData] = None
     weather: Optional[WeatherData] = None
     elevation: Optional[ElevationData] = None
@@ -104,6 +148,82 @@ class AlertNotification(BaseModel):
     sent_at: datetime = Field(default_factory=datetime.utcnow)
 
 
+class GeoPoint(BaseModel):
+    latitude: float
+    longitude: float
+
+
+class AreaAlertRequest(BaseModel):
+    """Target subscribers inside a polygon, or within radius_m of a center point."""
+    polygon: Optional[List[GeoPoint]] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    radius_m: Optional[float] = Field(default=None, gt=0)
+    preview: bool = True  # Evaluate without sending
+
+
+class AreaAlertResult(BaseModel):
+    phone_number: str
+    address: str
+    risk: RiskScore
+    alert: bool  # Risk meets the subscriber's threshold
+    sent: bool = False
+
+
+class AreaAlertResponse(BaseModel):
+    preview: bool
+    matched: int
+    alerts: int
+    results: List[AreaAlertResult] = []
+
+
+# --- Backtest Models ---
+
+class AlertEpisode(BaseModel):
+    start: datetime
+    end: datetime
+    peak_score: float
+
+
+class LocationBacktest(BaseModel):
+    name: str
+    elevation_ft: float
+    alert_steps: int
+    episodes: List[AlertEpisode] = []
+
+
+class BacktestMetrics(BaseModel):
+    weights: Dict[str, float]
+    alert_steps: int
+    alert_episodes: int
+    hits: int = Field(description="Steps alerting while the gauge was at flood stage")
+    misses: int = Field(description="Flood-stage steps without an alert")
+    false_alarms: int = Field(description="Alerting steps below flood stage")
+    pod: float = Field(description="Probability of detection, hits / (hits + misses)")
+    far: float = Field(description="False alarm ratio, false_alarms / (hits + false_alarms)")
+    csi: float = Field(description="Critical success index, hits / (hits + misses + false_alarms)")
+
+
+# --- Dashboard Models ---
+
+class SampleRisk(BaseModel):
+    name: str
+    address: str
+    latitude: float
+    longitude: float
+    note: str = ""
+    tide_station: str
+    elevation_ft: float
+    risk: RiskScore
+
+
+class Dashboard(BaseModel):
+    generation: int
+    tide: Optional[TideData] = None
+    weather: Optional[WeatherData] = None
+    samples: Optional[List[SampleRisk]] = None
+
+
 # --- API Request/Response ---
 
 class AddressRequest(BaseModel):
@@ -1,8 +1,18 @@
 """Alert subscription API routes."""
 
-from fastapi import APIRouter, HTTPException
-from app.models.schemas import AlertSubscription
-from app.services import notification_service
+import asyncio
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from app.config import settings
+from app.models.schemas import (
+    AlertSubscription,
+    AreaAlertRequest,
+    AreaAlertResponse,
+    AreaAlertResult,
+)
+from app.services import notification_service, elevation_service, snapshot_service
 
 router = APIRouter(prefix="/api/alerts", tags=["alerts"])
 
@@ -30,3 +40,84 @@ async def list_subscriptions():
     """List all active alert subscriptions."""
     subs = notification_service.get_subscriptions()
     return {"count": len(subs), "subscriptions": subs}
+
+
+def _require_admin(x_admin_token: Optional[str] = Header(default=None)):
+    if not settings.admin_token:
+        raise HTTPException(status_code=503, detail="Admin endpoints are disabled; set ADMIN_TOKEN")
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token.encode(), settings.admin_token.encode()):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+@router.post("/admin/area", response_model=AreaAlertResponse, dependencies=[Depends(_require_admin)])
+async def area_alert(request: AreaAlertRequest):
+    """
+    Preview or broadcast alerts to subscribers inside a polygon or radius.
+
+    Subscribers are found through the spatial index, so cost scales with the
+    number of matches. Each match is scored for its own elevation; alerts go
+    out only where risk meets the subscriber's threshold, and only when
+    `preview` is false.
+    """
+    if request.polygon is not None:
+        if len(request.polygon) < 3:
+            raise HTTPException(status_code=400, detail="Polygon needs at least 3 points")
+        subs = notification_service.find_subscriptions_in_polygon(
+            [(p.latitude, p.longitude) for p in request.polygon]
+        )
+    elif None not in (request.latitude, request.longitude, request.radius_m):
+        subs = notification_service.find_subscriptions_within(
+            request.latitude, request.longitude, request.radius_m
+        )
+    else:
+        raise HTTPException(
+            status_code=400,
+            detail="Provide a polygon, or latitude, longitude and radius_m",
+        )
+
+    if not subs:
+        return AreaAlertResponse(preview=request.preview, matched=0, alerts=0)
+
+    # Snapshots are per location (nearest tide gauge) but served from cache;
+    # a semaphore keeps a large area from firing every upstream call at once
+    limit = asyncio.Semaphore(settings.area_alert_concurrency)
+
+    async def score_inputs(sub: AlertSubscription):
+        async with limit:
+            return await asyncio.gather(
+                snapshot_service.get_snapshot(sub.latitude, sub.longitude),
+                elevation_service.get_elevation(sub.latitude, sub.longitude),
+            )
+
+    async def send(sub: AlertSubscription, risk):
+        async with limit:
+            return await notification_service.send_alert(sub, risk)
+
+    inputs = await asyncio.gather(*(score_inputs(sub) for sub in subs))
+
+    results = []
+    for sub, (snapshot, elevation_data) in zip(subs, inputs):
+        risk = snapshot_service.get_risk(snapshot, elevation_data)
+        results.append(
+            AreaAlertResult(
+                phone_number=sub.phone_number,
+                address=sub.address,
+                risk=risk,
+                alert=notification_service.should_alert(risk, sub.threshold_grade.value),
+            )
+        )
+
+    if not request.preview:
+        to_send = [(sub, r) for sub, r in zip(subs, results) if r.alert]
+        notifications = await asyncio.gather(
+            *(send(sub, r.risk) for sub, r in to_send)
+        )
+        for (_, result), notification in zip(to_send, notifications):
+            result.sent = notification is not None
+
+    return AreaAlertResponse(
+        preview=request.preview,
+        matched=len(results),
+        alerts=sum(1 for r in results if r.alert),
+        results=results,
+    )
@@ -0,0 +1,128 @@
+"""
+Aggregated dashboard route.
+
+Returns everything the frontend shows on load in one response: current
+tide data, the weather forecast, and risk for each sample location. All of
+it comes from the service caches. Each combination of sections is
+serialized (and compressed, per encoding) once per data generation and
+served as bytes until the generation advances.
+"""
+
+import asyncio
+import uuid
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Request, Response
+
+from app import compression
+from app.compression import PrecompressedBody
+from app.models.schemas import Dashboard, SampleRisk
+from app.routers.risk_router import SAMPLE_LOCATIONS
+from app.services import elevation_service, snapshot_service
+
+router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
+
+SECTIONS = ("tide", "weather", "samples")
+
+# Distinguishes ETags across restarts, since generations start over at 0
+_BOOT_ID = uuid.uuid4().hex[:8]
+
+_generation: Optional[int] = None
+_dashboard: Optional[Dashboard] = None
+_rendered: dict[frozenset, PrecompressedBody] = {}  # Per field selection
+
+
+def _parse_fields(fields: Optional[str]) -> frozenset:
+    if not fields:
+        return frozenset(SECTIONS)
+    selected = frozenset(f.strip() for f in fields.split(",") if f.strip())
+    unknown = selected - set(SECTIONS)
+    if unknown or not selected:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown dashboard fields: {', '.join(sorted(unknown))}. Choose from {', '.join(SECTIONS)}.",
+        )
+    return selected
+
+
+async def _gather():
+    """Current snapshots for the default view and each sample location, from the caches."""
+    default, *samples = await asyncio.gather(
+        snapshot_service.get_snapshot(),
+        *(
+            asyncio.gather(
+                snapshot_service.get_snapshot(loc["latitude"], loc["longitude"]),
+                elevation_service.get_elevation(loc["latitude"], loc["longitude"]),
+            )
+            for loc in SAMPLE_LOCATIONS
+        ),
+    )
+    return default, samples
+
+
+def _build(generation: int, default, sample_data) -> Dashboard:
+    samples = []
+    for loc, (snapshot, elevation) in zip(SAMPLE_LOCATIONS, sample_data):
+        samples.append(
+            SampleRisk(
+                name=loc["name"],
+                address=loc["address"],
+                latitude=loc["latitude"],
+                longitude=loc["longitude"],
+                note=loc.get("note", ""),
+                tide_station=snapshot.tide.station_id,
+                elevation_ft=elevation.elevation_ft,
+                risk=snapshot_service.get_risk(snapshot, elevation),
+            )
+        )
+    return Dashboard(generation=generation, tide=default.tide, weather=default.weather, samples=samples)
+
+
+@router.get("")
+async def get_dashboard(request: Request, fields: Optional[str] = None):
+    """
+    Tide, weather and sample-location risk in one response.
+
+    `fields` is a comma-separated subset of `tide`, `weather` and `samples`
+    (default: all). Responses carry an ETag, so unchanged data revalidates
+    with a 304.
+    """
+    global _generation, _dashboard
+    selected = _parse_fields(fields)
+
+    # Snapshots come from the caches, so this is cheap; it also lets the
+    # generation advance if any upstream data changed. The generation used
+    # is the one the snapshots were taken at, never one read afterwards.
+    default, sample_data = await _gather()
+    generations = {default.generation, *(snapshot.generation for snapshot, _ in sample_data)}
+    if len(generations) > 1:
+        # A refresh landed mid-gather; the caches now hold the newer data
+        default, sample_data = await _gather()
+        generations = {default.generation, *(snapshot.generation for snapshot, _ in sample_data)}
+    generation = max(generations)
+
+    if len(generations) > 1:
+        # Still mixed: serve this build as is, without caching or an ETag
+        dashboard = _build(generation, default, sample_data)
+        body = dashboard.model_dump_json(include={"generation", *selected}).encode()
+        return compression.respond(request, PrecompressedBody(body), headers={"Cache-Control": "no-cache"})
+
+    if _generation is None or generation > _generation:
+        _generation = generation
+        _dashboard = _build(generation, default, sample_data)
+        _rendered.clear()
+    # An older generation (a slow request) is served the newer cached data
+    generation = _generation
+
+    payload = _rendered.get(selected)
+    if payload is None:
+        payload = _rendered[selected] = PrecompressedBody(
+            _dashboard.model_dump_json(include={"generation", *selected}).encode()
+        )
+
+    # Weak, since the same data goes out in several encodings
+    etag = f'W/"{_BOOT_ID}-{generation}-{"-".join(s for s in SECTIONS if s in selected)}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return compression.respond(request, payload, headers=headers)
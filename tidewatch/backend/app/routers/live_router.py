@@ -0,0 +1,88 @@
+"""Live risk feed routes (Server-Sent Events and WebSocket)."""
+
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Request, WebSocket
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+
+from app.config import settings
+from app.services.live_feed import feed
+
+router = APIRouter(prefix="/api/live", tags=["live"])
+
+SSE_KEEPALIVE = b": keepalive\n\n"
+
+
+def _in_coverage(latitude: float, longitude: float) -> bool:
+    return 36.7 <= latitude <= 37.1 and -76.5 <= longitude <= -76.1
+
+
+@router.get("/risk")
+async def stream_risk(request: Request, latitude: float, longitude: float):
+    """
+    Subscribe to live tide, weather and risk updates for a location via SSE.
+
+    Sends `tide`, `weather` and `risk` events on connect, then only the
+    sections that change on each data refresh.
+    """
+    if not _in_coverage(latitude, longitude):
+        raise HTTPException(status_code=400, detail="Coordinates must be within the Norfolk, VA area.")
+
+    sub = await feed.subscribe(latitude, longitude)
+    if sub is None:
+        raise HTTPException(status_code=503, detail="Live feed is at capacity, try again later")
+
+    async def events():
+        try:
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(sub.queue.get(), settings.live_heartbeat_seconds)
+                    yield message.sse
+                except asyncio.TimeoutError:
+                    yield SSE_KEEPALIVE
+        finally:
+            feed.unsubscribe(sub)
+
+    # The generator's finally only runs once streaming starts; the background
+    # task also covers clients that disconnect before that
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(feed.unsubscribe, sub),
+    )
+
+
+@router.websocket("/ws")
+async def websocket_risk(websocket: WebSocket, latitude: float, longitude: float):
+    """Subscribe to live updates for a location over a WebSocket (same messages as SSE)."""
+    if not _in_coverage(latitude, longitude):
+        await websocket.close(code=1008)
+        return
+
+    sub = await feed.subscribe(latitude, longitude)
+    if sub is None:
+        await websocket.close(code=1013)
+        return
+
+    async def send():
+        while True:
+            message = await sub.queue.get()
+            await websocket.send_text(message.text)
+
+    async def receive():
+        # Clients don't send anything; this just notices disconnects
+        while True:
+            await websocket.receive_text()
+
+    tasks = []
+    try:
+        await websocket.accept()
+        tasks = [asyncio.create_task(send()), asyncio.create_task(receive())]
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        feed.unsubscribe(sub)
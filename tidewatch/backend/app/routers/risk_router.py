@@ -2,19 +2,58 @@
 
 from fastapi import APIRouter, HTTPException
 from app.models.schemas import AddressRequest, RiskAssessment
-from app.services import noaa_service, weather_service, elevation_service
-from app.engine.risk_engine import calculate_risk
+from app.services import elevation_service, snapshot_service
 
 router = APIRouter(prefix="/api/risk", tags=["risk"])
 
+# Sample Norfolk neighborhoods for quick testing
+SAMPLE_LOCATIONS = [
+    {
+        "name": "Ghent / The Hague",
+        "address": "Ghent, Norfolk, VA",
+        "latitude": 36.8695,
+        "longitude": -76.2960,
+        "note": "Historically flood-prone neighborhood",
+    },
+    {
+        "name": "Larchmont",
+        "address": "Larchmont, Norfolk, VA",
+        "latitude": 36.8760,
+        "longitude": -76.2890,
+        "note": "Low-lying residential area near Lafayette River",
+    },
+    {
+        "name": "Downtown Norfolk",
+        "address": "Downtown Norfolk, VA",
+        "latitude": 36.8468,
+        "longitude": -76.2852,
+        "note": "Waterfront area near Town Point Park",
+    },
+    {
+        "name": "Ocean View",
+        "address": "Ocean View, Norfolk, VA",
+        "latitude": 36.9260,
+        "longitude": -76.2530,
+        "note": "Chesapeake Bay waterfront community",
+    },
+    {
+        "name": "757 Startup Studios (Hackathon Venue)",
+        "address": "Assembly, Norfolk, VA",
+        "latitude": 36.8562,
+        "longitude": -76.2590,
+        "note": "The Assembly campus",
+    },
+]
+
 
 @router.post("/assess", response_model=RiskAssessment)
-async def assess_risk(request: AddressRequest):
+async def assess_risk(request: AddressRequest, ensemble: bool = False):
     """
     Assess flood risk for a specific address/location.
 
     Combines real-time tide data, weather forecast, and ground elevation
-    to compute a composite risk score.
+    to compute a composite risk score. With `ensemble=true`, also returns
+    score percentiles and grade probabilities from perturbed inputs.
     """
     # Validate coordinates are roughly in Norfolk area
     if not (36.7 <= request.latitude <= 37.1 and -76.5 <= request.longitude <= -76.1):
@@ -26,20 +65,27 @@ async def assess_risk(request: AddressRequest):
     # Fetch all data sources concurrently
     import asyncio
 
-    tide_data, weather_data, elevation_data = await asyncio.gather(
-        noaa_service.get_tide_data(),
-        weather_service.get_weather_data(),
+    snapshot, elevation_data = await asyncio.gather(
+        snapshot_service.get_snapshot(request.latitude, request.longitude),
         elevation_service.get_elevation(request.latitude, request.longitude),
     )
+    tide_data, weather_data = snapshot.tide, snapshot.weather
+
+    # Calculate risk score (memoized per data generation and elevation)
+    risk = snapshot_service.get_risk(snapshot, elevation_data)
+    ensemble_risk = None
+    if ensemble:
+        # NumPy loads on the first ensemble request rather than at boot
+        from app.engine.ensemble import calculate_risk_ensemble
 
-    # Calculate risk score
-    risk = calculate_risk(tide_data, weather_data, elevation_data)
+        ensemble_risk = calculate_risk_ensemble(tide_data, weather_data, elevation_data)
 
     return RiskAssessment(
         address=request.address,
         latitude=request.latitude,
         longitude=request.longitude,
         risk=risk,
+        ensemble=ensemble_risk,
         tide=tide_data,
         weather=weather_data,
         elevation=elevation_data,
@@ -49,42 +95,4 @@ async def assess_risk(request: AddressRequest):
 @router.get("/sample")
 async def sample_locations():
     """Return sample Norfolk locations for quick testing."""
-    return {
-        "locations": [
-            {
-                "name": "Ghent / The Hague",
-                "address": "Ghent, Norfolk, VA",
-                "latitude": 36.8695,
-                "longitude": -76.2960,
-                "note": "Historically flood-prone neighborhood",
-            },
-            {
-                "name": "Larchmont",
-                "address": "Larchmont, Norfolk, VA",
-                "latitude": 36.8760,
-                "longitude": -76.2890,
-                "note": "Low-lying residential area near Lafayette River",
-            },
-            {
-                "name": "Downtown Norfolk",
-                "address": "Downtown Norfolk, VA",
-                "latitude": 36.8468,
-                "longitude": -76.2852,
-                "note": "Waterfront area near Town Point Park",
-            },
-            {
-                "name": "Ocean View",
-                "address": "Ocean View, Norfolk, VA",
-                "latitude": 36.9260,
-                "longitude": -76.2530,
-                "note": "Chesapeake Bay waterfront community",
-            },
-            {
-                "name": "757 Startup Studios (Hackathon Venue)",
-                "address": "Assembly, Norfolk, VA",
-                "latitude": 36.8562,
-                "longitude": -76.2590,
-                "note": "The Assembly campus",
-            },
-        ]
-    }
+    return {"locations": SAMPLE_LOCATIONS}
@@ -1,30 +1,132 @@
 """Tide data API routes."""
 
-from fastapi import APIRouter
-from app.services import noaa_service
-from app.models.schemas import TideData
+import json
+from typing import Any, Callable, Hashable, Optional
+
+from cachetools import LRUCache
+from fastapi import APIRouter, HTTPException, Query, Request
+from app import compression
+from app.compression import PrecompressedBody
+from app.services import noaa_service, stations
+from app.models.schemas import TideData, TideEvents, TideStation
 
 router = APIRouter(prefix="/api/tides", tags=["tides"])
 
+# Serialized (and lazily compressed) payloads, reused while the cached data
+# they were rendered from is unchanged: key -> (source values, payload)
+_payloads: LRUCache = LRUCache(maxsize=256)
+
+
+def _shared_payload(key: Hashable, sources: tuple, render: Callable[[], bytes]) -> PrecompressedBody:
+    """Payload for `key`, re-rendered only when a source value changes."""
+    entry = _payloads.get(key)
+    # Equality, not identity: TideData is rebuilt per call around the cached
+    # readings, and list equality is cheap when the elements are shared
+    if entry is None or any(a is not b and a != b for a, b in zip(entry[0], sources)):
+        entry = _payloads[key] = (sources, PrecompressedBody(render()))
+    return entry[1]
+
+
+def _dumps(content: Any) -> bytes:
+    # Same encoding as FastAPI's default JSONResponse
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+def _select_station(
+    station: Optional[str], latitude: Optional[float], longitude: Optional[float]
+) -> TideStation:
+    """Pick a station by id, else nearest to a location, else the default."""
+    if station is not None:
+        found = stations.get_station(station)
+        if found is None:
+            raise HTTPException(status_code=404, detail=f"Unknown station {station}")
+        return found
+    if latitude is not None and longitude is not None:
+        return stations.nearest_stations(latitude, longitude)[0][0]
+    return stations.resolve_station()
+
 
 @router.get("/current", response_model=TideData)
-async def get_current_tides():
-    """Get current water level and 48-hour tide predictions for Sewells Point."""
-    return await noaa_service.get_tide_data()
+async def get_current_tides(
+    request: Request,
+    station: Optional[str] = None,
+    latitude: Optional[float] = None,
+    longitude: Optional[float] = None,
+):
+    """
+    Get current water level and 48-hour tide predictions.
+
+    Uses the given station, the gauge nearest latitude/longitude, or
+    Sewells Point by default.
+    """
+    if station is None and latitude is not None and longitude is not None:
+        tide = await noaa_service.get_tide_data_for_location(latitude, longitude)
+    else:
+        tide = await noaa_service.get_tide_data(_select_station(station, latitude, longitude).id)
+    payload = _shared_payload(
+        ("current", noaa_service.tide_key(tide)), (tide.current, tide.predictions), lambda: tide.model_dump_json().encode()
+    )
+    return compression.respond(request, payload)
 
 
 @router.get("/predictions")
-async def get_predictions(hours: int = 48):
+async def get_predictions(
+    request: Request,
+    hours: int = Query(default=48, ge=1, le=168),
+    station: Optional[str] = None,
+    latitude: Optional[float] = None,
+    longitude: Optional[float] = None,
+):
     """Get tide predictions for the next N hours."""
-    predictions = await noaa_service.get_tide_predictions(hours=min(hours, 168))
+    selected = _select_station(station, latitude, longitude)
+    predictions = await noaa_service.get_tide_predictions(hours=hours, station_id=selected.id)
+    payload = _shared_payload(
+        ("predictions", selected.id, hours),
+        (predictions,),
+        lambda: _dumps({
+            "station": selected.name,
+            "station_id": selected.id,
+            "predictions": [
+                {
+                    "timestamp": p.timestamp.isoformat(),
+                    "prediction_ft": p.prediction_ft,
+                }
+                for p in predictions
+            ],
+        }),
+    )
+    return compression.respond(request, payload)
+
+
+@router.get("/events", response_model=TideEvents)
+async def get_tide_events(
+    request: Request,
+    station: Optional[str] = None,
+    latitude: Optional[float] = None,
+    longitude: Optional[float] = None,
+):
+    """
+    Predicted high/low tides and flood-stage intervals (UTC).
+
+    Served from the index built when the station's predictions were last
+    fetched; nothing is computed per request.
+    """
+    selected = _select_station(station, latitude, longitude)
+    events = await noaa_service.get_tide_events(selected.id)
+    if events is None:
+        raise HTTPException(status_code=503, detail="Tide predictions unavailable")
+    payload = _shared_payload(("events", selected.id), (events,), lambda: events.model_dump_json().encode())
+    return compression.respond(request, payload)
+
+
+@router.get("/stations")
+async def list_stations(latitude: Optional[float] = None, longitude: Optional[float] = None):
+    """List registered tide stations, nearest first when a location is given."""
+    if latitude is None or longitude is None:
+        return {"stations": stations.STATIONS}
     return {
-        "station": "Sewells Point, VA",
-        "station_id": "8638610",
-        "predictions": [
-            {
-                "timestamp": p.timestamp.isoformat(),
-                "prediction_ft": p.prediction_ft,
-            }
-            for p in predictions
-        ],
+        "stations": [
+            {**s.model_dump(), "distance_km": round(d / 1000, 2)}
+            for s, d in stations.nearest_stations(latitude, longitude, k=len(stations.STATIONS))
+        ]
     }
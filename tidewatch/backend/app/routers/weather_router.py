@@ -1,16 +1,20 @@
 """Weather data API routes."""
 
-from fastapi import APIRouter
-from app.services import weather_service
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from app.services import nws_grid, weather_service
 
 router = APIRouter(prefix="/api/weather", tags=["weather"])
 
 
 @router.get("/forecast")
-async def get_forecast():
-    """Get current weather forecast for Norfolk, VA area."""
-    weather = await weather_service.get_weather_data()
+async def get_forecast(latitude: Optional[float] = None, longitude: Optional[float] = None):
+    """Get the weather forecast for a location's NWS grid cell (default: central Norfolk)."""
+    cell = nws_grid.grid_cell(latitude, longitude)
+    weather = await weather_service.get_weather_data(cell=cell)
     return {
+        "grid_cell": str(cell),
         "precipitation_forecast_in": weather.precipitation_forecast_in,
         "wind_speed_mph": weather.wind_speed_mph,
         "wind_direction": weather.wind_direction,
@@ -26,3 +30,19 @@ async def get_forecast():
             for p in weather.periods
         ],
     }
+
+
+@router.get("/hourly")
+async def get_hourly(
+    latitude: Optional[float] = None,
+    longitude: Optional[float] = None,
+    hours: int = Query(default=48, ge=1, le=168),
+):
+    """Hourly rain amount, precipitation chance, wind and temperature for a location's grid cell."""
+    from app.services import nws_hourly
+
+    cell = nws_grid.grid_cell(latitude, longitude)
+    series = await weather_service.get_hourly(cell)
+    if series is None:
+        raise HTTPException(status_code=503, detail="Hourly forecast unavailable")
+    return {"grid_cell": str(cell), **nws_hourly.to_dict(series, hours)}
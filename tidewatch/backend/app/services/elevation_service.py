@@ -1,9 +1,10 @@
 """USGS National Elevation Dataset API client."""
 
-import httpx
 from cachetools import TTLCache
 
+from app import log
 from app.models.schemas import ElevationData
+from app.services.http_client import get_client
 
 # Cache elevation lookups for 24 hours (terrain doesn't change)
 _elevation_cache: TTLCache = TTLCache(maxsize=500, ttl=86400)
@@ -30,10 +31,9 @@ async def get_elevation(latitude: float, longitude: float) -> ElevationData:
     }
 
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            resp = await client.get(USGS_ELEVATION_URL, params=params)
-            resp.raise_for_status()
-            data = resp.json()
+        resp = await get_client().get(USGS_ELEVATION_URL, params=params)
+        resp.raise_for_status()
+        data = resp.json()
 
         elevation_ft = float(data.get("value", 0))
 
@@ -47,7 +47,7 @@ async def get_elevation(latitude: float, longitude: float) -> ElevationData:
         return result
 
     except Exception as e:
-        print(f"[USGS] Error fetching elevation: {e}")
+        log.warning("usgs.elevation_failed", latitude=latitude, longitude=longitude, error=str(e))
         # Return a conservative default (low elevation = higher risk)
         return ElevationData(
             latitude=latitude,
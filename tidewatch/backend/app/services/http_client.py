@@ -0,0 +1,46 @@
+"""Shared pooled HTTP client for upstream APIs (NOAA, NWS, USGS)."""
+
+from typing import TYPE_CHECKING, Optional
+
+from app.config import settings
+
+if TYPE_CHECKING:
+    import httpx
+
+_client: Optional["httpx.AsyncClient"] = None
+
+
+def get_client() -> "httpx.AsyncClient":
+    """Return the process-wide client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        # Imported here so httpx (and its async backends) load after boot
+        import httpx
+
+        limits = httpx.Limits(max_connections=20, max_keepalive_connections=10)
+        _client = httpx.AsyncClient(timeout=10.0, limits=limits, transport=_transport(limits))
+    return _client
+
+
+def _transport(limits) -> Optional["httpx.AsyncBaseTransport"]:
+    """Network transport, optionally recording to or replaying from the archive."""
+    if settings.http_mode == "live":
+        return None
+
+    import httpx
+    from app.services import upstream_archive
+
+    if settings.http_mode == "record":
+        return upstream_archive.RecordingTransport(
+            settings.http_archive_path, httpx.AsyncHTTPTransport(limits=limits)
+        )
+    if settings.http_mode == "replay":
+        return upstream_archive.ReplayTransport(settings.http_archive_path)
+    raise ValueError(f"Unknown HTTP_MODE {settings.http_mode!r}; expected live, record or replay")
+
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,184 @@
+"""
+Live risk feed - pushes tide, weather and risk updates to subscribed clients.
+
+A single publisher loop refreshes on a fixed interval. Clients subscribe to
+a location, quantized to a ~100 m channel; a channel whose data generation
+hasn't changed is skipped. Tide (per gauge), weather (per forecast grid cell)
+and risk updates are each serialized once per refresh and the same message
+object is handed to every connection that needs it; only sections that
+changed are sent. Each
+connection buffers at most a few messages, dropping the oldest when a client
+falls behind, so memory stays bounded however many clients sit idle.
+"""
+
+import asyncio
+from typing import Any, NamedTuple, Optional
+
+from app import log
+from app.config import settings
+from app.models.schemas import ElevationData
+from app.services import elevation_service, noaa_service, snapshot_service
+
+# Channel quantization: 3 decimal places ≈ 110 m north-south
+CHANNEL_DECIMALS = 3
+
+
+class FeedMessage(NamedTuple):
+    """One update, pre-framed for both transports."""
+    text: str  # WebSocket text frame
+    sse: bytes  # Server-Sent Events frame
+
+
+def _message(event: str, body_json: str) -> FeedMessage:
+    text = f'{{"type":"{event}","{event}":{body_json}}}'
+    return FeedMessage(text=text, sse=f"event: {event}\ndata: {text}\n\n".encode())
+
+
+class Subscriber:
+    """A connection's bounded inbox; when full, the oldest message is dropped."""
+
+    __slots__ = ("channel", "queue")
+
+    def __init__(self, channel: tuple[float, float]):
+        self.channel = channel
+        self.queue: asyncio.Queue[FeedMessage] = asyncio.Queue(maxsize=settings.live_queue_size)
+
+    def offer(self, message: FeedMessage):
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+
+
+class _Channel:
+    __slots__ = ("latitude", "longitude", "subscribers", "elevation", "generation", "sections", "messages")
+
+    def __init__(self, latitude: float, longitude: float):
+        self.latitude = latitude
+        self.longitude = longitude
+        self.subscribers: set[Subscriber] = set()
+        self.elevation: Optional[ElevationData] = None
+        self.generation: Optional[int] = None
+        self.sections: dict[str, str] = {}  # Last JSON sent per section
+        self.messages: dict[str, FeedMessage] = {}  # Last message per section, for new subscribers
+
+
+# Messages built during one publish pass, keyed by (section, source) so that
+# channels sharing a tide gauge, forecast cell or risk result share the bytes
+_SharedMessages = dict[tuple[str, Any], tuple[str, FeedMessage, Any]]
+
+
+class LiveFeed:
+    def __init__(self):
+        self._channels: dict[tuple[float, float], _Channel] = {}
+        self._connections = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def connections(self) -> int:
+        return self._connections
+
+    @staticmethod
+    def channel_key(latitude: float, longitude: float) -> tuple[float, float]:
+        return (round(latitude, CHANNEL_DECIMALS), round(longitude, CHANNEL_DECIMALS))
+
+    # --- Subscriptions ---
+
+    async def subscribe(self, latitude: float, longitude: float) -> Optional[Subscriber]:
+        """Register a connection; returns None when the connection limit is reached."""
+        if self._connections >= settings.live_max_connections:
+            return None
+
+        key = self.channel_key(latitude, longitude)
+        channel = self._channels.get(key)
+        if channel is None:
+            channel = self._channels[key] = _Channel(*key)
+
+        sub = Subscriber(key)
+        channel.subscribers.add(sub)
+        self._connections += 1
+
+        # New connections start from a full snapshot; if that fails (or the
+        # client goes away meanwhile) the slot is given back
+        try:
+            if channel.generation is None:
+                await self._refresh_channel(channel, {})
+        except BaseException:
+            self.unsubscribe(sub)
+            raise
+        for message in channel.messages.values():
+            sub.offer(message)
+        return sub
+
+    def unsubscribe(self, sub: Subscriber):
+        """Release a connection's slot; safe to call more than once."""
+        channel = self._channels.get(sub.channel)
+        if channel is None or sub not in channel.subscribers:
+            return
+        channel.subscribers.discard(sub)
+        self._connections -= 1
+        if not channel.subscribers:
+            del self._channels[sub.channel]
+
+    # --- Publishing ---
+
+    async def _refresh_channel(self, channel: _Channel, shared: _SharedMessages) -> list[FeedMessage]:
+        """Bring a channel up to date; return messages for the sections that changed."""
+        snapshot = await snapshot_service.get_snapshot(channel.latitude, channel.longitude)
+        if snapshot.generation == channel.generation:
+            return []
+        channel.generation = snapshot.generation
+
+        if channel.elevation is None:
+            channel.elevation = await elevation_service.get_elevation(channel.latitude, channel.longitude)
+        risk = snapshot_service.get_risk(snapshot, channel.elevation)
+
+        changed = []
+        for section, source, model in (
+            ("tide", noaa_service.tide_key(snapshot.tide), snapshot.tide),
+            ("weather", snapshot.weather_cell, snapshot.weather),
+            # Memoized scores are shared objects, so identity groups channels
+            ("risk", id(risk), risk),
+        ):
+            entry = shared.get((section, source))
+            if entry is None:
+                body = model.model_dump_json()
+                # Keep the model referenced so its id() stays unique this pass
+                entry = shared[(section, source)] = (body, _message(section, body), model)
+            body, message, _ = entry
+            if channel.sections.get(section) != body:
+                channel.sections[section] = body
+                channel.messages[section] = message
+                changed.append(message)
+        return changed
+
+    async def publish(self):
+        """Refresh every channel once and fan changed sections out to subscribers."""
+        shared: _SharedMessages = {}
+        for channel in list(self._channels.values()):
+            for message in await self._refresh_channel(channel, shared):
+                for sub in channel.subscribers:
+                    sub.offer(message)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(settings.live_refresh_seconds)
+            try:
+                await self.publish()
+            except Exception as e:
+                log.error("live.publish_failed", error=str(e))
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+feed = LiveFeed()
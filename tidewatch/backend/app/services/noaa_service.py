@@ -1,28 +1,80 @@
-"""NOAA Tides & Currents API client for Sewells Point station."""
+"""NOAA Tides & Currents API client for Hampton Roads tide stations."""
 
-import httpx
+import asyncio
 from datetime import datetime, timedelta
-from typing import Optional
-from cachetools import TTLCache
+from typing import Callable, Optional
+from cachetools import LRUCache, TTLCache
 
+from app import log
 from app.config import settings
-from app.models.schemas import TideReading, TideData
+from app.models.schemas import TideReading, TideData, TideEvents, TideStation
+from app.services import stations
+from app.services.http_client import get_client
 
-# Cache tide data for 6 minutes (NOAA updates every 6 min)
-_tide_cache: TTLCache = TTLCache(maxsize=10, ttl=360)
+# One cache per station, expiring on that station's refresh interval
+# (NOAA updates water levels every 6 min)
+_tide_caches: dict[str, TTLCache] = {}
 
 
-async def get_current_water_level() -> Optional[TideReading]:
+def _station_cache(station: TideStation) -> TTLCache:
+    cache = _tide_caches.get(station.id)
+    if cache is None:
+        cache = _tide_caches[station.id] = TTLCache(maxsize=10, ttl=station.refresh_seconds)
+    return cache
+
+
+# Blend weights are quantized to this step, so nearby locations share one
+# blended result per set of gauge readings
+BLEND_WEIGHT_STEP = 0.05
+
+# Blended TideData per (gauges, quantized weights, gauge readings); unchanged
+# inputs give back the same objects, so snapshot generations don't advance
+_blends: LRUCache = LRUCache(maxsize=256)
+
+# Horizon of the predictions every station keeps fresh; only this series
+# feeds the event index, so shorter ad-hoc fetches can't truncate it
+PREDICTION_HOURS = 48
+
+# Highs/lows and flood-stage crossings per station, rebuilt from each
+# PREDICTION_HOURS fetch (see services/tide_events.py)
+_tide_events: dict[str, TideEvents] = {}
+_event_listeners: list[Callable[[TideEvents], None]] = []
+
+
+def on_tide_events(callback: Callable[[TideEvents], None]):
+    """Call `callback(events)` whenever a station's event index is rebuilt."""
+    _event_listeners.append(callback)
+
+
+def _index_predictions(station: TideStation, predictions: list[TideReading]):
+    # Imported here so NumPy loads with the first predictions, not at boot
+    from app.services import tide_events
+
+    try:
+        events = _tide_events[station.id] = tide_events.build(station, predictions)
+    except Exception as e:
+        log.warning("noaa.tide_events_failed", station=station.id, error=str(e))
+        return
+    for callback in _event_listeners:
+        try:
+            callback(events)
+        except Exception as e:
+            log.warning("noaa.tide_events_listener_failed", station=station.id, error=str(e))
+
+
+async def get_current_water_level(station_id: Optional[str] = None) -> Optional[TideReading]:
     """Fetch the latest observed water level from NOAA."""
+    station = stations.resolve_station(station_id)
+    cache = _station_cache(station)
     cache_key = "current_water_level"
-    if cache_key in _tide_cache:
-        return _tide_cache[cache_key]
+    if cache_key in cache:
+        return cache[cache_key]
 
     now = datetime.utcnow()
     params = {
         "begin_date": (now - timedelta(hours=1)).strftime("%Y%m%d %H:%M"),
         "end_date": now.strftime("%Y%m%d %H:%M"),
-        "station": settings.noaa_station_id,
+        "station": station.id,
         "product": "water_level",
         "datum": "MLLW",
         "units": "english",
@@ -31,10 +83,9 @@ async def get_current_water_level() -> Optional[TideReading]:
     }
 
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            resp = await client.get(settings.noaa_base_url, params=params)
-            resp.raise_for_status()
-            data = resp.json()
+        resp = await get_client().get(settings.noaa_base_url, params=params)
+        resp.raise_for_status()
+        data = resp.json()
 
         if "data" in data and len(data["data"]) > 0:
             latest = data["data"][-1]
@@ -42,27 +93,29 @@ async def get_current_water_level() -> Optional[TideReading]:
                 timestamp=datetime.strptime(latest["t"], "%Y-%m-%d %H:%M"),
                 water_level_ft=float(latest["v"]),
                 prediction_ft=0.0,
-                station_id=settings.noaa_station_id,
+                station_id=station.id,
             )
-            _tide_cache[cache_key] = reading
+            cache[cache_key] = reading
             return reading
     except Exception as e:
-        print(f"[NOAA] Error fetching water level: {e}")
+        log.warning("noaa.water_level_failed", station=station.id, error=str(e))
 
     return None
 
 
-async def get_tide_predictions(hours: int = 48) -> list[TideReading]:
+async def get_tide_predictions(hours: int = PREDICTION_HOURS, station_id: Optional[str] = None) -> list[TideReading]:
     """Fetch tide predictions for the next N hours."""
+    station = stations.resolve_station(station_id)
+    cache = _station_cache(station)
     cache_key = f"predictions_{hours}"
-    if cache_key in _tide_cache:
-        return _tide_cache[cache_key]
+    if cache_key in cache:
+        return cache[cache_key]
 
     now = datetime.utcnow()
     params = {
         "begin_date": now.strftime("%Y%m%d %H:%M"),
         "end_date": (now + timedelta(hours=hours)).strftime("%Y%m%d %H:%M"),
-        "station": settings.noaa_station_id,
+        "station": station.id,
         "product": "predictions",
         "datum": "MLLW",
         "units": "english",
@@ -73,10 +126,9 @@ async def get_tide_predictions(hours: int = 48) -> list[TideReading]:
 
     predictions = []
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            resp = await client.get(settings.noaa_base_url, params=params)
-            resp.raise_for_status()
-            data = resp.json()
+        resp = await get_client().get(settings.noaa_base_url, params=params)
+        resp.raise_for_status()
+        data = resp.json()
 
         if "predictions" in data:
             for p in data["predictions"]:
@@ -85,23 +137,135 @@ async def get_tide_predictions(hours: int = 48) -> list[TideReading]:
                         timestamp=datetime.strptime(p["t"], "%Y-%m-%d %H:%M"),
                         water_level_ft=0.0,
                         prediction_ft=float(p["v"]),
-                        station_id=settings.noaa_station_id,
+                        station_id=station.id,
                     )
                 )
-            _tide_cache[cache_key] = predictions
+            cache[cache_key] = predictions
     except Exception as e:
-        print(f"[NOAA] Error fetching predictions: {e}")
+        log.warning("noaa.predictions_failed", station=station.id, error=str(e))
+        return predictions
 
+    if predictions and hours == PREDICTION_HOURS:
+        _index_predictions(station, predictions)
     return predictions
 
 
-async def get_tide_data() -> TideData:
-    """Get combined current water level and predictions."""
-    current = await get_current_water_level()
-    predictions = await get_tide_predictions(hours=48)
+def cached_tide_events(station_id: str) -> Optional[TideEvents]:
+    """The station's current event index, without fetching."""
+    return _tide_events.get(station_id)
+
+
+async def get_tide_events(station_id: Optional[str] = None) -> Optional[TideEvents]:
+    """
+    High/low tides and flood-stage intervals for a station, from the index
+    built when its predictions were last fetched. Only the first call for a
+    station fetches predictions; None if they are unavailable.
+    """
+    station = stations.resolve_station(station_id)
+    events = _tide_events.get(station.id)
+    if events is None:
+        await get_tide_predictions(PREDICTION_HOURS, station.id)
+        events = _tide_events.get(station.id)
+    return events
+
+
+async def get_tide_data(station_id: Optional[str] = None) -> TideData:
+    """Get combined current water level and predictions for a station."""
+    station = stations.resolve_station(station_id)
+    current, predictions = await asyncio.gather(
+        get_current_water_level(station.id),
+        get_tide_predictions(PREDICTION_HOURS, station.id),
+    )
 
     return TideData(
         current=current,
         predictions=predictions,
-        station_name="Sewells Point, VA",
+        station_name=station.name,
+        station_id=station.id,
     )
+
+
+async def get_tide_data_for_location(latitude: float, longitude: float) -> TideData:
+    """
+    Get tide data from the gauge nearest a location.
+
+    With `tide_blend_stations` > 1, the current water level is an
+    inverse-distance-weighted blend of the nearest gauges within
+    `tide_blend_radius_m`; predictions still come from the nearest gauge.
+    """
+    nearest = stations.nearest_stations(latitude, longitude, k=max(settings.tide_blend_stations, 1))
+    if not nearest:
+        return await get_tide_data()
+    blend = [nearest[0]] + [(s, d) for s, d in nearest[1:] if d <= settings.tide_blend_radius_m]
+
+    station = blend[0][0]
+    data, *others = await asyncio.gather(
+        get_tide_data(station.id),
+        *(get_current_water_level(s.id) for s, _ in blend[1:]),
+    )
+    if len(blend) == 1:
+        return data
+
+    readings = [(data.current, blend[0][1])] + [(r, d) for r, (_, d) in zip(others, blend[1:])]
+    readings = [(r, d) for r, d in readings if r is not None]
+    if len(readings) < 2:
+        return data
+
+    # A gauge closer than 10 m simply dominates instead of dividing by zero
+    raw = [1.0 / max(d, 10.0) ** 2 for _, d in readings]
+    total = sum(raw)
+    weights = [round(round(w / total / BLEND_WEIGHT_STEP) * BLEND_WEIGHT_STEP, 3) for w in raw]
+    blended = [(r, w) for (r, _), w in zip(readings, weights) if w > 0]
+    if len(blended) < 2:
+        return data
+
+    key = tuple((r.station_id, w, r.timestamp, r.water_level_ft) for r, w in blended)
+    cached = _blends.get(key)
+    # Models copy their lists, but the readings inside are the cached objects
+    if cached is not None and cached.predictions == data.predictions:
+        return cached
+
+    level = sum(w * r.water_level_ft for r, w in blended) / sum(w for _, w in blended)
+    ids = [r.station_id for r, _ in blended]
+    current = TideReading(
+        timestamp=max(r.timestamp for r, _ in blended),
+        water_level_ft=round(level, 3),
+        prediction_ft=0.0,
+        station_id="+".join(ids),
+    )
+    tide = _blends[key] = TideData(
+        current=current,
+        predictions=data.predictions,
+        station_name=f"{station.name} (blended with {len(ids) - 1} nearby gauges)",
+        station_id=current.station_id,
+        blend_weights=[w for _, w in blended],
+    )
+    return tide
+
+
+def tide_key(tide: TideData) -> str:
+    """Identifies the source of a TideData: its gauge, or gauges and weights when blended."""
+    if tide.blend_weights is None:
+        return tide.station_id
+    return f"{tide.station_id}@{','.join(f'{w:g}' for w in tide.blend_weights)}"
+
+
+async def refresh_all_stations(hours: int = PREDICTION_HOURS):
+    """
+    Fetch every registered station concurrently over the shared client.
+
+    Stations whose cached data is still fresh are served from cache, so each
+    one is only refetched on its own refresh interval.
+    """
+    await asyncio.gather(
+        *(get_current_water_level(s.id) for s in stations.STATIONS),
+        *(get_tide_predictions(hours, s.id) for s in stations.STATIONS),
+    )
+
+
+async def run_station_refresh():
+    """Keep all station caches warm after startup warmup; runs until cancelled."""
+    interval = min(s.refresh_seconds for s in stations.STATIONS)
+    while True:
+        await asyncio.sleep(interval)
+        await refresh_all_stations()
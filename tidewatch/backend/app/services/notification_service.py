@@ -1,32 +1,56 @@
 """Twilio SMS notification service for flood alerts."""
 
-from datetime import datetime
+import asyncio
+from datetime import datetime, timedelta, timezone
 from typing import Optional
+from zoneinfo import ZoneInfo
 
+from app import log
 from app.config import settings
-from app.models.schemas import AlertSubscription, AlertNotification, RiskScore
+from app.models.schemas import AlertSubscription, AlertNotification, FloodInterval, RiskScore, TideEvents
+from app.services import noaa_service, stations
+from app.services.spatial_index import GridIndex
 
 # In-memory store for subscriptions (would be a database in production)
 _subscriptions: dict[str, AlertSubscription] = {}
 
+# Spatial index of subscriber coordinates, keyed by phone number like _subscriptions
+_subscriber_index = GridIndex()
+
+# Phone numbers per nearest tide station, for station-wide (tide) alerts
+_subscribers_by_station: dict[str, set[str]] = {}
+_subscriber_station: dict[str, str] = {}
+
+
+# Created on the first send so the Twilio SDK never loads at boot
+_twilio_client = None
+
 
 def _get_twilio_client():
     """Lazy-load Twilio client only when needed."""
+    global _twilio_client
     if not settings.twilio_account_sid or not settings.twilio_auth_token:
         return None
-    try:
-        from twilio.rest import Client
-        return Client(settings.twilio_account_sid, settings.twilio_auth_token)
-    except Exception as e:
-        print(f"[Twilio] Failed to create client: {e}")
-        return None
+    if _twilio_client is None:
+        try:
+            from twilio.rest import Client
+            _twilio_client = Client(settings.twilio_account_sid, settings.twilio_auth_token)
+        except Exception as e:
+            log.error("twilio.client_failed", error=str(e))
+            return None
+    return _twilio_client
 
 
 def subscribe(subscription: AlertSubscription) -> bool:
     """Add or update an alert subscription."""
     key = subscription.phone_number
     _subscriptions[key] = subscription
-    print(f"[Alerts] Subscribed: {subscription.phone_number} for {subscription.address}")
+    _subscriber_index.insert(key, subscription.latitude, subscription.longitude)
+    _remove_from_station(key)
+    station_id = stations.nearest_stations(subscription.latitude, subscription.longitude)[0][0].id
+    _subscriber_station[key] = station_id
+    _subscribers_by_station.setdefault(station_id, set()).add(key)
+    log.info("alerts.subscribed", phone=subscription.phone_number, address=subscription.address)
     return True
 
 
@@ -34,15 +58,36 @@ def unsubscribe(phone_number: str) -> bool:
     """Remove an alert subscription."""
     if phone_number in _subscriptions:
         del _subscriptions[phone_number]
+        _subscriber_index.remove(phone_number)
+        _remove_from_station(phone_number)
         return True
     return False
 
 
+def _remove_from_station(phone_number: str):
+    station_id = _subscriber_station.pop(phone_number, None)
+    if station_id is not None:
+        phones = _subscribers_by_station[station_id]
+        phones.discard(phone_number)
+        if not phones:
+            del _subscribers_by_station[station_id]
+
+
 def get_subscriptions() -> list[AlertSubscription]:
     """Get all active subscriptions."""
     return list(_subscriptions.values())
 
 
+def find_subscriptions_in_polygon(polygon: list[tuple[float, float]]) -> list[AlertSubscription]:
+    """Get subscriptions located inside a polygon of (lat, lon) vertices."""
+    return [_subscriptions[key] for key in _subscriber_index.query_polygon(polygon)]
+
+
+def find_subscriptions_within(latitude: float, longitude: float, radius_m: float) -> list[AlertSubscription]:
+    """Get subscriptions located within radius_m meters of a point."""
+    return [_subscriptions[key] for key in _subscriber_index.query_radius(latitude, longitude, radius_m)]
+
+
 def _build_alert_message(sub: AlertSubscription, risk: RiskScore) -> str:
     """Build human-readable alert message."""
     return (
@@ -54,40 +99,43 @@ def _build_alert_message(sub: AlertSubscription, risk: RiskScore) -> str:
     )
 
 
-async def send_alert(
-    subscription: AlertSubscription,
-    risk: RiskScore,
-) -> Optional[AlertNotification]:
-    """Send an SMS alert for a risk threshold breach."""
-    message_text = _build_alert_message(subscription, risk)
-
+async def _deliver(phone_number: str, message_text: str) -> bool:
+    """Send one SMS, or just log it when Twilio isn't configured."""
     client = _get_twilio_client()
     if client is None:
         # Log the alert even if we can't send it
-        print(f"[Alerts] Would send to {subscription.phone_number}: {message_text}")
-        return AlertNotification(
-            subscription=subscription,
-            risk=risk,
-            message=message_text,
-            sent_at=datetime.utcnow(),
-        )
+        log.info("alerts.would_send", phone=phone_number, message=message_text)
+        return True
 
     try:
-        message = client.messages.create(
+        # The SDK blocks on the HTTP call, so keep it off the event loop
+        message = await asyncio.to_thread(
+            client.messages.create,
             body=message_text,
             from_=settings.twilio_from_number,
-            to=subscription.phone_number,
-        )
-        print(f"[Alerts] Sent SMS {message.sid} to {subscription.phone_number}")
-        return AlertNotification(
-            subscription=subscription,
-            risk=risk,
-            message=message_text,
-            sent_at=datetime.utcnow(),
+            to=phone_number,
         )
+        log.info("alerts.sent", sid=message.sid, phone=phone_number)
+        return True
     except Exception as e:
-        print(f"[Alerts] Failed to send SMS: {e}")
+        log.error("alerts.send_failed", phone=phone_number, error=str(e))
+        return False
+
+
+async def send_alert(
+    subscription: AlertSubscription,
+    risk: RiskScore,
+) -> Optional[AlertNotification]:
+    """Send an SMS alert for a risk threshold breach."""
+    message_text = _build_alert_message(subscription, risk)
+    if not await _deliver(subscription.phone_number, message_text):
         return None
+    return AlertNotification(
+        subscription=subscription,
+        risk=risk,
+        message=message_text,
+        sent_at=datetime.utcnow(),
+    )
 
 
 # Grade severity ordering for threshold comparison
@@ -99,3 +147,116 @@ def should_alert(risk: RiskScore, threshold_grade: str) -> bool:
     risk_severity = _GRADE_SEVERITY.get(risk.grade.value, 0)
     threshold_severity = _GRADE_SEVERITY.get(threshold_grade, 2)
     return risk_severity >= threshold_severity
+
+
+# --- Lead-time high water alerts ---
+
+# Flood stage -> the subscriber threshold grade it counts as
+_STAGE_GRADE = {"minor": "C", "moderate": "D", "major": "F"}
+
+# Created with the first tide event index so APScheduler never loads at boot
+_scheduler = None
+
+# Predictions move a crossing by minutes between refreshes; one within this of
+# an already scheduled crossing is the same one (flood tides are ~12 h apart)
+CROSSING_TOLERANCE = timedelta(hours=2)
+
+# (station, threshold) -> starts of crossings already scheduled, pruned once past
+_scheduled: dict[tuple[str, float], list[datetime]] = {}
+
+
+def _get_scheduler():
+    global _scheduler
+    if _scheduler is None:
+        try:
+            from apscheduler.schedulers.asyncio import AsyncIOScheduler
+        except ImportError as e:
+            log.error("alerts.scheduler_unavailable", error=str(e))
+            return None
+        _scheduler = AsyncIOScheduler(timezone="UTC")
+        _scheduler.start()
+    return _scheduler
+
+
+def stop_scheduler():
+    global _scheduler
+    if _scheduler is not None:
+        _scheduler.shutdown(wait=False)
+        _scheduler = None
+
+
+def _local(utc: datetime) -> datetime:
+    return utc.replace(tzinfo=timezone.utc).astimezone(ZoneInfo(settings.alert_timezone))
+
+
+def _build_high_water_message(station_name: str, interval: FloodInterval) -> str:
+    return (
+        f"🌊 TideWatch Alert\n"
+        f"High water expected at {_local(interval.start):%H:%M} at {station_name}: "
+        f"{interval.stage} flood stage ({interval.threshold_ft} ft).\n"
+        f"Peak {interval.peak_ft} ft around {_local(interval.peak_time):%H:%M}."
+    )
+
+
+def schedule_tide_alerts(events: TideEvents):
+    """
+    Schedule "high water expected at ..." alerts for upcoming flood-stage
+    crossings, `tide_alert_lead_minutes` ahead. Called with each rebuilt
+    tide event index, so nothing rescans the prediction series.
+    """
+    now = datetime.utcnow()
+    for key, starts in list(_scheduled.items()):
+        starts[:] = [start for start in starts if start > now]
+        if not starts:
+            del _scheduled[key]
+
+    for interval in events.flood:
+        if interval.start is None or interval.start <= now:
+            continue
+        starts = _scheduled.get((events.station_id, interval.threshold_ft), [])
+        if any(abs(interval.start - start) <= CROSSING_TOLERANCE for start in starts):
+            continue
+        scheduler = _get_scheduler()
+        if scheduler is None:
+            return
+        run_at = max(interval.start - timedelta(minutes=settings.tide_alert_lead_minutes), now)
+        scheduler.add_job(
+            _send_high_water_alerts,
+            "date",
+            run_date=run_at,
+            args=[events.station_id, interval.threshold_ft, interval.start],
+            id=f"tide:{events.station_id}:{interval.threshold_ft}:{interval.start:%Y%m%d%H%M}",
+            replace_existing=True,
+            misfire_grace_time=600,
+        )
+        _scheduled.setdefault((events.station_id, interval.threshold_ft), []).append(interval.start)
+        log.info("alerts.tide_scheduled", station=events.station_id, stage=interval.stage,
+                 start=interval.start.isoformat(), run_at=run_at.isoformat())
+
+
+async def _send_high_water_alerts(station_id: str, threshold_ft: float, start: datetime):
+    """Alert subscribers served by the station whose threshold the crossing's stage meets."""
+    # The index may have been rebuilt since; only announce a crossing it still predicts
+    events = noaa_service.cached_tide_events(station_id)
+    interval = next(
+        (
+            i for i in (events.flood if events else [])
+            if i.threshold_ft == threshold_ft and i.start is not None and abs(i.start - start) <= CROSSING_TOLERANCE
+        ),
+        None,
+    )
+    if interval is None:
+        return
+
+    station = stations.get_station(station_id)
+    grade = _STAGE_GRADE.get(interval.stage, "C")
+    subs = [
+        sub for sub in (_subscriptions[phone] for phone in _subscribers_by_station.get(station_id, ()))
+        if _GRADE_SEVERITY[grade] >= _GRADE_SEVERITY.get(sub.threshold_grade.value, 2)
+    ]
+    message_text = _build_high_water_message(station.name if station else station_id, interval)
+    await asyncio.gather(*(_deliver(sub.phone_number, message_text) for sub in subs))
+    log.info("alerts.tide_sent", station=station_id, stage=interval.stage, recipients=len(subs))
+
+
+noaa_service.on_tide_events(schedule_tide_alerts)
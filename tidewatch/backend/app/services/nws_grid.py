@@ -0,0 +1,162 @@
+"""
+Local lookup table from lat/lon to NWS forecast grid cells.
+
+NWS forecasts are served per 2.5 km grid cell, and the API's `/points`
+endpoint is the official way to find a location's cell. Rather than calling
+it per request, the coverage area is covered by a lattice of precomputed cell
+ids, built on first lookup:
+
+  - from a JSON table written by `python -m app.cli grid-table`, which asks
+    `/points` for every lattice point (authoritative), if one is configured
+  - otherwise by projecting onto the NDFD 2.5 km Lambert conformal grid that
+    NWS office grids are cut from, aligned so the configured Norfolk point
+    lands on the configured cell (can be off by one cell near edges)
+"""
+
+import json
+import math
+import os
+from array import array
+from typing import NamedTuple, Optional
+
+from app.config import settings
+
+# Coverage area (matches the coordinate check in the routers) and the city
+# limits whose cells are prefetched
+TABLE_BOUNDS = (36.7, -76.5, 37.1, -76.1)  # min_lat, min_lon, max_lat, max_lon
+CITY_BOUNDS = (36.82, -76.34, 36.97, -76.17)
+
+# NDFD CONUS 2.5 km grid: tangent Lambert conformal at 25°N, centered on 95°W
+_EARTH_RADIUS_M = 6_371_200.0
+_GRID_SPACING_M = 2_539.703
+_STANDARD_PARALLEL = math.radians(25.0)
+_CENTRAL_MERIDIAN = math.radians(-95.0)
+
+
+class GridCell(NamedTuple):
+    office: str
+    x: int
+    y: int
+
+    def __str__(self) -> str:
+        return f"{self.office}/{self.x},{self.y}"
+
+
+def _lambert_xy(lat: float, lon: float) -> tuple[float, float]:
+    """Project to NDFD grid units (x east, y north) relative to the projection origin."""
+    n = math.sin(_STANDARD_PARALLEL)
+    f = math.cos(_STANDARD_PARALLEL) * math.tan(math.pi / 4 + _STANDARD_PARALLEL / 2) ** n / n
+    rho = _EARTH_RADIUS_M * f / math.tan(math.pi / 4 + math.radians(lat) / 2) ** n
+    rho0 = _EARTH_RADIUS_M * f / math.tan(math.pi / 4 + _STANDARD_PARALLEL / 2) ** n
+    theta = n * (math.radians(lon) - _CENTRAL_MERIDIAN)
+    return rho * math.sin(theta) / _GRID_SPACING_M, (rho0 - rho * math.cos(theta)) / _GRID_SPACING_M
+
+
+class _Table(NamedTuple):
+    bounds: tuple[float, float, float, float]
+    step: float
+    cols: int
+    cells: list[GridCell]  # Distinct cells; the lattice stores indices into this
+    index: array
+
+
+def _lattice_shape(bounds: tuple[float, float, float, float], step: float) -> tuple[int, int]:
+    min_lat, min_lon, max_lat, max_lon = bounds
+    return round((max_lat - min_lat) / step) + 1, round((max_lon - min_lon) / step) + 1
+
+
+def lattice_points(step: float, bounds: tuple[float, float, float, float] = TABLE_BOUNDS):
+    """(lat, lon) of every lattice point, row-major from the south-west corner."""
+    min_lat, min_lon, _, _ = bounds
+    rows, cols = _lattice_shape(bounds, step)
+    return [(min_lat + r * step, min_lon + c * step) for r in range(rows) for c in range(cols)]
+
+
+def _intern(cell_ids: list[GridCell]) -> tuple[list[GridCell], array]:
+    cells: list[GridCell] = []
+    positions: dict[GridCell, int] = {}
+    index = array("H")
+    for cell in cell_ids:
+        pos = positions.get(cell)
+        if pos is None:
+            pos = positions[cell] = len(cells)
+            cells.append(cell)
+        index.append(pos)
+    return cells, index
+
+
+def _projected_table() -> _Table:
+    step = settings.nws_grid_table_step_deg
+    ax, ay = _lambert_xy(settings.norfolk_lat, settings.norfolk_lon)
+    off_x = settings.nws_grid_x - round(ax)
+    off_y = settings.nws_grid_y - round(ay)
+
+    cell_ids = []
+    for lat, lon in lattice_points(step):
+        x, y = _lambert_xy(lat, lon)
+        cell_ids.append(GridCell(settings.nws_office, round(x) + off_x, round(y) + off_y))
+    cells, index = _intern(cell_ids)
+    return _Table(TABLE_BOUNDS, step, _lattice_shape(TABLE_BOUNDS, step)[1], cells, index)
+
+
+def _file_table(path: str) -> _Table:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    bounds = tuple(data["bounds"])
+    cells = [GridCell(office, x, y) for office, x, y in data["cells"]]
+    return _Table(bounds, data["step"], _lattice_shape(bounds, data["step"])[1], cells, array("H", data["index"]))
+
+
+def dump_table(path: str, step: float, cell_ids: list[GridCell]):
+    """Write a lattice of cell ids (in `lattice_points(step)` order) as a table file."""
+    cells, index = _intern(cell_ids)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(
+            {"bounds": TABLE_BOUNDS, "step": step, "cells": [list(c) for c in cells], "index": index.tolist()},
+            f,
+        )
+
+
+def _load_table() -> _Table:
+    path = settings.nws_grid_table_path
+    if path and os.path.exists(path):
+        return _file_table(path)
+    return _projected_table()
+
+
+_table: Optional[_Table] = None
+
+
+def _get_table() -> _Table:
+    global _table
+    if _table is None:
+        _table = _load_table()
+    return _table
+
+
+def default_cell() -> GridCell:
+    return GridCell(settings.nws_office, settings.nws_grid_x, settings.nws_grid_y)
+
+
+def grid_cell(latitude: Optional[float] = None, longitude: Optional[float] = None) -> GridCell:
+    """NWS grid cell for a location; the configured cell when outside coverage or unset."""
+    if latitude is None or longitude is None:
+        return default_cell()
+    table = _get_table()
+    min_lat, min_lon, max_lat, max_lon = table.bounds
+    if not (min_lat <= latitude <= max_lat and min_lon <= longitude <= max_lon):
+        return default_cell()
+    row = round((latitude - min_lat) / table.step)
+    col = round((longitude - min_lon) / table.step)
+    return table.cells[table.index[row * table.cols + col]]
+
+
+def city_cells() -> list[GridCell]:
+    """Distinct cells covering the city limits, for bulk prefetch."""
+    min_lat, min_lon, max_lat, max_lon = CITY_BOUNDS
+    seen = {}
+    for lat, lon in lattice_points(_get_table().step, TABLE_BOUNDS):
+        if min_lat <= lat <= max_lat and min_lon <= lon <= max_lon:
+            cell = grid_cell(lat, lon)
+            seen[cell] = None
+    return list(seen)
@@ -0,0 +1,296 @@
+"""
+Hourly NWS data as compact NumPy time series.
+
+Raw gridpoint data (`/gridpoints/{office}/{x},{y}`) reports each field as a
+list of values over ISO-8601 intervals such as `2024-01-01T06:00:00+00:00/PT6H`.
+Those intervals are expanded onto a fixed hourly axis starting at the hour of
+ingestion: accumulations (QPF) are split evenly across the hours they cover,
+everything else is repeated. The hourly forecast (`.../forecast/hourly`) is
+parsed onto the same axis as a fallback; it has no precipitation amounts.
+
+Payloads run to hundreds of KB, so they are parsed from the response stream
+with ijson (in requirements.txt), keeping only the handful of fields we use.
+Where ijson is missing the body is loaded with `json` and walked the same
+way, which is slower.
+"""
+
+import json
+import math
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, NamedTuple, Optional
+
+import numpy as np
+
+from app.config import settings
+from app.engine.vectorized import COMPASS_POINTS, SECTOR_DEGREES, direction_to_degrees
+
+SERIES_FIELDS = ("qpf_in", "pop_pct", "wind_speed_mph", "wind_direction_deg", "temperature_f")
+
+# Gridpoint field -> (series attribute, whether values accumulate over the interval)
+GRIDPOINT_FIELDS = {
+    "quantitativePrecipitation": ("qpf_in", True),
+    "probabilityOfPrecipitation": ("pop_pct", False),
+    "windSpeed": ("wind_speed_mph", False),
+    "windDirection": ("wind_direction_deg", False),
+    "temperature": ("temperature_f", False),
+}
+
+# Unit code -> (scale, offset) into the series' units
+UNIT_CONVERSIONS = {
+    "wmoUnit:mm": (1 / 25.4, 0.0),
+    "wmoUnit:km_h-1": (0.621371, 0.0),
+    "wmoUnit:m_s-1": (2.236936, 0.0),
+    "wmoUnit:degC": (1.8, 32.0),
+}
+
+_DURATION = re.compile(r"P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?)?$")
+
+
+class HourlySeries(NamedTuple):
+    """Hourly values from `start` (UTC, on the hour); NaN where no data."""
+    start: datetime
+    source: str  # "gridpoint" or "hourly"
+    qpf_in: np.ndarray
+    pop_pct: np.ndarray
+    wind_speed_mph: np.ndarray
+    wind_direction_deg: np.ndarray
+    temperature_f: np.ndarray
+
+
+def _epoch_hour(timestamp: str) -> int:
+    return math.floor(datetime.fromisoformat(timestamp).timestamp() / 3600)
+
+
+def _duration_hours(duration: str) -> int:
+    match = _DURATION.match(duration)
+    if match is None:
+        raise ValueError(f"Unsupported ISO-8601 duration: {duration}")
+    days, hours, minutes = (int(g) if g else 0 for g in match.groups())
+    return max(days * 24 + hours + math.ceil(minutes / 60), 1)
+
+
+def parse_valid_time(valid_time: str) -> tuple[int, int]:
+    """Split `start/duration` into (start as hours since the epoch, length in hours)."""
+    start, _, duration = valid_time.partition("/")
+    return _epoch_hour(start), _duration_hours(duration or "PT1H")
+
+
+def _current_hour() -> int:
+    return math.floor(datetime.now(timezone.utc).timestamp() / 3600)
+
+
+class _SeriesBuilder:
+    """Expands interval values onto a fixed hourly axis."""
+
+    def __init__(self, source: str, hours: int):
+        self.source = source
+        self.start_hour = _current_hour()
+        self.hours = hours
+        self.arrays = {attr: np.full(hours, np.nan, dtype=np.float32) for attr in SERIES_FIELDS}
+
+    def fill(self, attr: str, start_hour: int, length: int, value: float, accumulate: bool = False):
+        lo = start_hour - self.start_hour
+        a, b = max(lo, 0), min(lo + length, self.hours)
+        if a < b:
+            self.arrays[attr][a:b] = value / length if accumulate else value
+
+    def build(self) -> HourlySeries:
+        start = datetime.fromtimestamp(self.start_hour * 3600, tz=timezone.utc)
+        return HourlySeries(start=start, source=self.source, **self.arrays)
+
+
+# --- Event parsers ---
+# Both consume (prefix, event, value) triples in the form `ijson.parse` yields
+
+
+class GridpointParser:
+    def __init__(self, hours: Optional[int] = None):
+        self._builder = _SeriesBuilder("gridpoint", hours or settings.nws_hourly_hours)
+        self._units: dict[str, str] = {}
+        self._prefixes: dict[str, tuple[str, str]] = {}
+        for field, (attr, _) in GRIDPOINT_FIELDS.items():
+            base = f"properties.{field}"
+            self._prefixes[f"{base}.uom"] = ("uom", field)
+            self._prefixes[f"{base}.values.item.validTime"] = ("time", field)
+            self._prefixes[f"{base}.values.item.value"] = ("value", field)
+            self._prefixes[f"{base}.values.item"] = ("item", field)
+        self._time: Optional[str] = None
+        self._value: Optional[float] = None
+
+    def feed(self, prefix: str, event: str, value: Any):
+        entry = self._prefixes.get(prefix)
+        if entry is None:
+            return
+        kind, field = entry
+        if kind == "uom":
+            self._units[field] = value
+        elif kind == "time":
+            self._time = value
+        elif kind == "value":
+            self._value = value
+        elif event == "end_map":
+            if self._time is not None and self._value is not None:
+                attr, accumulate = GRIDPOINT_FIELDS[field]
+                start, length = parse_valid_time(self._time)
+                self._builder.fill(attr, start, length, float(self._value), accumulate)
+            self._time = self._value = None
+
+    def result(self) -> HourlySeries:
+        # Values are stored as received; the unit may follow them in the payload
+        for field, unit in self._units.items():
+            scale, offset = UNIT_CONVERSIONS.get(unit, (1.0, 0.0))
+            if (scale, offset) != (1.0, 0.0):
+                array = self._builder.arrays[GRIDPOINT_FIELDS[field][0]]
+                array *= scale
+                array += offset
+        return self._builder.build()
+
+
+class HourlyForecastParser:
+    _PERIOD = "properties.periods.item"
+
+    def __init__(self, hours: Optional[int] = None):
+        self._builder = _SeriesBuilder("hourly", hours or settings.nws_hourly_hours)
+        self._period: dict[str, Any] = {}
+
+    def feed(self, prefix: str, event: str, value: Any):
+        if not prefix.startswith(self._PERIOD):
+            return
+        if prefix == self._PERIOD:
+            if event == "end_map":
+                self._add(self._period)
+                self._period = {}
+            return
+        key = prefix[len(self._PERIOD) + 1:]
+        if key in ("startTime", "endTime", "temperature", "windSpeed", "windDirection",
+                   "probabilityOfPrecipitation.value"):
+            self._period[key] = value
+
+    def _add(self, period: dict[str, Any]):
+        if "startTime" not in period:
+            return
+        start = _epoch_hour(period["startTime"])
+        length = max(_epoch_hour(period["endTime"]) - start, 1) if "endTime" in period else 1
+        fill = self._builder.fill
+        if period.get("temperature") is not None:
+            fill("temperature_f", start, length, float(period["temperature"]))
+        if period.get("probabilityOfPrecipitation.value") is not None:
+            fill("pop_pct", start, length, float(period["probabilityOfPrecipitation.value"]))
+        speeds = re.findall(r"\d+", period.get("windSpeed") or "")
+        if speeds:
+            fill("wind_speed_mph", start, length, max(float(s) for s in speeds))
+        degrees = direction_to_degrees(period.get("windDirection") or "")
+        if degrees is not None:
+            fill("wind_direction_deg", start, length, degrees)
+
+    def result(self) -> HourlySeries:
+        return self._builder.build()
+
+
+# --- Streaming ---
+
+
+def _events(node: Any, prefix: str = ""):
+    """Yield ijson-style parse events for an already-loaded JSON document."""
+    if isinstance(node, dict):
+        yield prefix, "start_map", None
+        for key, child in node.items():
+            yield prefix, "map_key", key
+            yield from _events(child, f"{prefix}.{key}" if prefix else key)
+        yield prefix, "end_map", None
+    elif isinstance(node, list):
+        yield prefix, "start_array", None
+        item = f"{prefix}.item" if prefix else "item"
+        for child in node:
+            yield from _events(child, item)
+        yield prefix, "end_array", None
+    elif node is None:
+        yield prefix, "null", None
+    elif isinstance(node, bool):
+        yield prefix, "boolean", node
+    elif isinstance(node, (int, float)):
+        yield prefix, "number", node
+    else:
+        yield prefix, "string", node
+
+
+class _ByteReader:
+    """Adapts an async byte iterator to the `async read(n)` ijson expects."""
+
+    def __init__(self, chunks: AsyncIterator[bytes]):
+        self._chunks = chunks
+        self._buffer = b""
+
+    async def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            try:
+                self._buffer += await self._chunks.__anext__()
+            except StopAsyncIteration:
+                break
+        if size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+def _optional_ijson():
+    try:
+        import ijson
+        return ijson
+    except ImportError:
+        return None
+
+
+async def parse_stream(chunks: AsyncIterator[bytes], parser) -> HourlySeries:
+    """Feed a JSON byte stream through a parser and return its series."""
+    ijson = _optional_ijson()
+    if ijson is None:
+        body = b"".join([chunk async for chunk in chunks])
+        for event in _events(json.loads(body)):
+            parser.feed(*event)
+    else:
+        async for event in ijson.parse_async(_ByteReader(chunks), use_float=True):
+            parser.feed(*event)
+    return parser.result()
+
+
+# --- Readers ---
+
+
+def _window(series: HourlySeries, array: np.ndarray, hours: int) -> np.ndarray:
+    """The next `hours` values from the current hour."""
+    offset = max(_current_hour() - math.floor(series.start.timestamp() / 3600), 0)
+    return array[offset: offset + hours]
+
+
+def precipitation_total(series: HourlySeries, hours: int) -> Optional[float]:
+    """Forecast rain in inches over the next `hours`; None without QPF data."""
+    qpf = _window(series, series.qpf_in, hours)
+    if qpf.size == 0 or np.isnan(qpf).all():
+        return None
+    return round(float(np.nansum(qpf)), 2)
+
+
+def peak_wind(series: HourlySeries, hours: int) -> Optional[tuple[float, str]]:
+    """Strongest wind over the next `hours` as (mph, compass point)."""
+    speed = _window(series, series.wind_speed_mph, hours)
+    if speed.size == 0 or np.isnan(speed).all():
+        return None
+    i = int(np.nanargmax(speed))
+    degrees = _window(series, series.wind_direction_deg, hours)[i]
+    direction = "" if np.isnan(degrees) else COMPASS_POINTS[round(degrees / SECTOR_DEGREES) % len(COMPASS_POINTS)]
+    return round(float(speed[i]), 1), direction
+
+
+def to_dict(series: HourlySeries, hours: int) -> dict:
+    """JSON-ready view of the next `hours`, with nulls where data is missing."""
+    offset = max(_current_hour() - math.floor(series.start.timestamp() / 3600), 0)
+    out: dict[str, Any] = {
+        "start": series.start + timedelta(hours=offset),
+        "source": series.source,
+    }
+    for attr in SERIES_FIELDS:
+        values = _window(series, getattr(series, attr), hours)
+        out[attr] = [None if math.isnan(v) else round(v, 2) for v in values.tolist()]
+    return out
@@ -0,0 +1,116 @@
+"""
+Generation-versioned tide/weather snapshots and memoized risk scores.
+
+Every caller that needs "current conditions" goes through `get_snapshot`,
+which tags the tide and weather data with a generation id. The id advances
+only when some part of the data actually changes (a cache refill brought new
+values, or an upstream went up or down), so anything derived purely from a
+snapshot can be cached per generation.
+
+Each source (a gauge's readings, its predictions, a forecast cell) also
+keeps its own version, bumped only when that source changes. Risk scores
+are memoized per (tide source and versions, forecast cell and version,
+quantized elevation), so new weather for one cell leaves every other cell's
+scores cached; superseded entries age out of the LRU bound.
+"""
+
+import asyncio
+from typing import Any, NamedTuple, Optional
+
+from cachetools import LRUCache
+
+from app.config import settings
+from app.engine.risk_engine import calculate_risk
+from app.models.schemas import TideData, WeatherData, ElevationData, RiskScore
+from app.services import noaa_service, nws_grid, weather_service
+from app.services.nws_grid import GridCell
+
+
+class Snapshot(NamedTuple):
+    generation: int
+    tide: TideData
+    weather: WeatherData
+    weather_cell: GridCell
+    versions: tuple[int, int, int]  # Tide readings, tide predictions, weather
+
+
+_MISSING = object()
+
+_generation = 0
+_last_seen: dict[str, Any] = {}
+_versions: dict[str, int] = {}
+
+_risk_cache: LRUCache = LRUCache(maxsize=settings.risk_cache_size)
+
+
+def current_generation() -> int:
+    return _generation
+
+
+def _observe(source: str, value: Any) -> bool:
+    """Record the latest value for a source; True if it differs from the last one."""
+    previous = _last_seen.get(source, _MISSING)
+    # Cached values come back as the same object, so identity is the fast path
+    if value is previous or value == previous:
+        return False
+    _last_seen[source] = value
+    _versions[source] = _versions.get(source, 0) + 1
+    return True
+
+
+async def get_snapshot(latitude: Optional[float] = None, longitude: Optional[float] = None) -> Snapshot:
+    """
+    Current tide and weather, tagged with their generation id.
+
+    With a location, tide data comes from the nearest gauge and the forecast
+    from the location's NWS grid cell; otherwise from the defaults.
+    """
+    global _generation
+    if latitude is not None and longitude is not None:
+        tide_fetch = noaa_service.get_tide_data_for_location(latitude, longitude)
+    else:
+        tide_fetch = noaa_service.get_tide_data()
+    cell = nws_grid.grid_cell(latitude, longitude)
+    tide, weather = await asyncio.gather(tide_fetch, weather_service.get_weather_data(cell=cell))
+
+    # No awaits below, so the generation and versions match exactly this data
+    tide_source = noaa_service.tide_key(tide)
+    sources = (f"tide.current:{tide_source}", f"tide.predictions:{tide_source}", f"weather:{cell}")
+    changed = [
+        _observe(sources[0], tide.current),
+        _observe(sources[1], tide.predictions),
+        _observe(sources[2], weather),
+    ]
+    if any(changed):
+        _generation += 1
+    return Snapshot(_generation, tide, weather, cell, tuple(_versions.get(s, 0) for s in sources))
+
+
+def _quantize(elevation_ft: float) -> float:
+    step = settings.risk_cache_elevation_step_ft
+    return round(round(elevation_ft / step) * step, 6)
+
+
+def get_risk(snapshot: Snapshot, elevation: ElevationData) -> RiskScore:
+    """
+    Risk for a snapshot and elevation, memoized per (tide source, forecast
+    cell, their versions, quantized elevation).
+
+    The score is computed from the quantized elevation, so every lookup that
+    lands in the same cell gets an identical result whether or not it hits.
+    """
+    elevation_ft = _quantize(elevation.elevation_ft)
+    # Fallback elevations lower confidence, so they're cached separately
+    key = (
+        noaa_service.tide_key(snapshot.tide),
+        snapshot.weather_cell,
+        snapshot.versions,
+        elevation_ft,
+        elevation.source.startswith("default"),
+    )
+
+    risk = _risk_cache.get(key)
+    if risk is None:
+        quantized = elevation.model_copy(update={"elevation_ft": elevation_ft})
+        risk = _risk_cache[key] = calculate_risk(snapshot.tide, snapshot.weather, quantized)
+    return risk
@@ -0,0 +1,149 @@
+"""In-memory grid spatial index for radius and polygon lookups of lat/lon points."""
+
+import math
+from typing import Hashable, Iterator, Optional, Sequence
+
+EARTH_RADIUS_M = 6_371_008.8
+METERS_PER_DEG_LAT = 111_320.0
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in meters."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def point_in_polygon(lat: float, lon: float, polygon: Sequence[tuple[float, float]]) -> bool:
+    """Ray-casting test; polygon is a sequence of (lat, lon) vertices, open or closed."""
+    inside = False
+    n = len(polygon)
+    j = n - 1
+    for i in range(n):
+        lat_i, lon_i = polygon[i]
+        lat_j, lon_j = polygon[j]
+        if (lat_i > lat) != (lat_j > lat):
+            crossing = lon_i + (lat - lat_i) * (lon_j - lon_i) / (lat_j - lat_i)
+            if lon < crossing:
+                inside = not inside
+        j = i
+    return inside
+
+
+class GridIndex:
+    """
+    Buckets points into fixed-size lat/lon cells.
+
+    Queries visit only the cells overlapping the query's bounding box, so cost
+    scales with the number of nearby points rather than the total indexed.
+    Inserting an existing key moves it.
+    """
+
+    def __init__(self, cell_deg: float = 0.005):
+        # 0.005° is roughly 550 m north-south at Norfolk's latitude
+        self.cell_deg = cell_deg
+        self._cells: dict[tuple[int, int], set] = {}
+        self._points: dict[Hashable, tuple[float, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._points
+
+    def _cell(self, lat: float, lon: float) -> tuple[int, int]:
+        return (math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg))
+
+    def insert(self, key: Hashable, lat: float, lon: float):
+        self.remove(key)
+        self._points[key] = (lat, lon)
+        self._cells.setdefault(self._cell(lat, lon), set()).add(key)
+
+    def remove(self, key: Hashable) -> bool:
+        point = self._points.pop(key, None)
+        if point is None:
+            return False
+        cell = self._cell(*point)
+        bucket = self._cells[cell]
+        bucket.discard(key)
+        if not bucket:
+            del self._cells[cell]
+        return True
+
+    def get(self, key: Hashable) -> Optional[tuple[float, float]]:
+        return self._points.get(key)
+
+    def _candidates(
+        self, min_lat: float, min_lon: float, max_lat: float, max_lon: float
+    ) -> Iterator[tuple[Hashable, float, float]]:
+        """Yield points in all cells overlapping the bounding box."""
+        lo_row, lo_col = self._cell(min_lat, min_lon)
+        hi_row, hi_col = self._cell(max_lat, max_lon)
+        span = (hi_row - lo_row + 1) * (hi_col - lo_col + 1)
+
+        if span <= len(self._cells):
+            cells = (
+                self._cells.get((row, col))
+                for row in range(lo_row, hi_row + 1)
+                for col in range(lo_col, hi_col + 1)
+            )
+        else:
+            # Huge box over a sparse index: walk the occupied cells instead
+            cells = (
+                bucket
+                for (row, col), bucket in self._cells.items()
+                if lo_row <= row <= hi_row and lo_col <= col <= hi_col
+            )
+
+        for bucket in cells:
+            if bucket:
+                for key in bucket:
+                    lat, lon = self._points[key]
+                    yield key, lat, lon
+
+    def query_bbox(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> list:
+        return [
+            key
+            for key, lat, lon in self._candidates(min_lat, min_lon, max_lat, max_lon)
+            if min_lat <= lat <= max_lat and min_lon <= lon <= max_lon
+        ]
+
+    def _within(self, lat: float, lon: float, radius_m: float) -> list[tuple[Hashable, float]]:
+        dlat = radius_m / METERS_PER_DEG_LAT
+        dlon = radius_m / (METERS_PER_DEG_LAT * max(math.cos(math.radians(lat)), 1e-6))
+        matches = []
+        for key, p_lat, p_lon in self._candidates(lat - dlat, lon - dlon, lat + dlat, lon + dlon):
+            distance = haversine_m(lat, lon, p_lat, p_lon)
+            if distance <= radius_m:
+                matches.append((key, distance))
+        return matches
+
+    def query_radius(self, lat: float, lon: float, radius_m: float) -> list:
+        """Keys within `radius_m` meters of (lat, lon)."""
+        return [key for key, _ in self._within(lat, lon, radius_m)]
+
+    def nearest(self, lat: float, lon: float, k: int = 1) -> list[tuple[Hashable, float]]:
+        """The k closest keys with their distances in meters, nearest first."""
+        k = min(k, len(self._points))
+        if k == 0:
+            return []
+        # Widen the search until it holds k points; everything inside the
+        # radius has been seen, so the k closest of those are exact
+        radius = self.cell_deg * METERS_PER_DEG_LAT
+        while True:
+            matches = self._within(lat, lon, radius)
+            if len(matches) >= k or radius > math.pi * EARTH_RADIUS_M:
+                return sorted(matches, key=lambda m: m[1])[:k]
+            radius *= 2
+
+    def query_polygon(self, polygon: Sequence[tuple[float, float]]) -> list:
+        """Keys inside a polygon of (lat, lon) vertices."""
+        lats = [p[0] for p in polygon]
+        lons = [p[1] for p in polygon]
+        return [
+            key
+            for key, lat, lon in self._candidates(min(lats), min(lons), max(lats), max(lons))
+            if point_in_polygon(lat, lon, polygon)
+        ]
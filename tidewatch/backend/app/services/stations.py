@@ -0,0 +1,72 @@
+"""
+Registry of Hampton Roads NOAA tide gauges with nearest-station lookup.
+
+Each gauge carries its own flood stages, since tidal range and datum differ
+between them. Sewells Point uses the configured `flood_stage_*_ft`; other
+gauges get stages from `station_flood_stages`, and have none (so no
+flood-stage intervals or alerts) until they are configured.
+"""
+
+from typing import Optional
+
+from app.config import settings
+from app.models.schemas import TideStation
+from app.services.spatial_index import GridIndex
+
+FLOOD_STAGE_NAMES = ("minor", "moderate", "major")
+
+
+def _flood_stages(levels) -> dict[str, float]:
+    return dict(zip(FLOOD_STAGE_NAMES, levels))
+
+
+STATIONS: list[TideStation] = [
+    TideStation(
+        id="8638610", name="Sewells Point, VA", latitude=36.9467, longitude=-76.3300,
+        flood_stages_ft=_flood_stages(
+            (settings.flood_stage_minor_ft, settings.flood_stage_moderate_ft, settings.flood_stage_major_ft)
+        ),
+    ),
+    TideStation(id="8638614", name="Willoughby Degaussing Station, VA", latitude=36.9822, longitude=-76.3217),
+    TideStation(id="8638660", name="Portsmouth, Norfolk Naval Shipyard, VA", latitude=36.8217, longitude=-76.2933),
+    TideStation(id="8639348", name="Money Point, VA", latitude=36.7783, longitude=-76.3017),
+    TideStation(id="8638863", name="Chesapeake Bay Bridge Tunnel, VA", latitude=36.9667, longitude=-76.1133),
+    TideStation(id="8638901", name="CBBT, Chesapeake Channel, VA", latitude=37.0329, longitude=-76.0833),
+    TideStation(id="8638511", name="Dominion Terminal Associates, VA", latitude=36.9623, longitude=-76.4242),
+    TideStation(id="8637689", name="Yorktown USCG Training Center, VA", latitude=37.2265, longitude=-76.4788),
+    TideStation(id="8632200", name="Kiptopeke, VA", latitude=37.1652, longitude=-75.9884),
+]
+
+_stations_by_id: dict[str, TideStation] = {s.id: s for s in STATIONS}
+
+for _station_id, _levels in settings.station_flood_stages.items():
+    if _station_id in _stations_by_id:
+        _stations_by_id[_station_id].flood_stages_ft = _flood_stages(_levels)
+
+# Gauges are tens of km apart, so coarse cells keep the index small
+_station_index = GridIndex(cell_deg=0.1)
+for _station in STATIONS:
+    _station_index.insert(_station.id, _station.latitude, _station.longitude)
+
+
+def get_station(station_id: str) -> Optional[TideStation]:
+    return _stations_by_id.get(station_id)
+
+
+def resolve_station(station_id: Optional[str] = None) -> TideStation:
+    """Station for an id (default: the configured station), even if unregistered."""
+    station_id = station_id or settings.noaa_station_id
+    station = _stations_by_id.get(station_id)
+    if station is None:
+        station = TideStation(
+            id=station_id,
+            name=f"NOAA {station_id}",
+            latitude=settings.norfolk_lat,
+            longitude=settings.norfolk_lon,
+        )
+    return station
+
+
+def nearest_stations(latitude: float, longitude: float, k: int = 1) -> list[tuple[TideStation, float]]:
+    """The k closest stations with distances in meters, nearest first."""
+    return [(_stations_by_id[sid], d) for sid, d in _station_index.nearest(latitude, longitude, k)]
@@ -0,0 +1,109 @@
+"""
+High/low tides and flood-stage crossings from a prediction series.
+
+Everything is found in one vectorized pass over the (hourly) predictions:
+  - extrema where the first difference changes sign, refined by fitting a
+    parabola through the sample and its two neighbours, so times land
+    between samples (e.g. a high at 14:12 rather than 14:00);
+  - crossings of the station's minor/moderate/major flood stages, linearly
+    interpolated between the samples either side, paired into intervals.
+
+All times are UTC, like the NOAA predictions they come from.
+"""
+
+from datetime import datetime, timedelta
+from typing import Sequence
+
+import numpy as np
+
+from app.models.schemas import FloodInterval, TideEvents, TideExtreme, TideReading, TideStation
+
+
+def _extrema(t: np.ndarray, h: np.ndarray):
+    """(times, heights, is_high) of interior extrema, in time order."""
+    d = np.diff(h)
+    # A flat top (a, b, b, c) is found once, at its first sample; the fit
+    # then puts the vertex halfway along the plateau
+    highs = np.flatnonzero((d[:-1] > 0) & (d[1:] <= 0)) + 1
+    lows = np.flatnonzero((d[:-1] < 0) & (d[1:] >= 0)) + 1
+    idx = np.concatenate([highs, lows])
+    is_high = np.concatenate([np.ones(highs.size, bool), np.zeros(lows.size, bool)])
+
+    y0, y1, y2 = h[idx - 1], h[idx], h[idx + 1]
+    curvature = y0 - 2 * y1 + y2
+    safe = np.where(curvature == 0, 1.0, curvature)
+    offset = np.clip(np.where(curvature == 0, 0.0, 0.5 * (y0 - y2) / safe), -1.0, 1.0)
+    heights = y1 - 0.25 * (y0 - y2) * offset
+    times = t[idx] + offset * (t[idx + 1] - t[idx - 1]) / 2
+
+    order = np.argsort(times, kind="stable")
+    return times[order], heights[order], is_high[order]
+
+
+def _crossings(t: np.ndarray, h: np.ndarray, level: float):
+    """Interpolated (starts, ends) of spells at or above `level`; NaN for open ends."""
+    above = h >= level
+    i = np.flatnonzero(above[1:] != above[:-1])
+    times = t[i] + (level - h[i]) / (h[i + 1] - h[i]) * (t[i + 1] - t[i])
+    rising = above[i + 1]
+    starts, ends = times[rising], times[~rising]
+    if above[0]:
+        starts = np.concatenate([[np.nan], starts])
+    if above[-1]:
+        ends = np.concatenate([ends, [np.nan]])
+    return starts, ends
+
+
+def build(station: TideStation, predictions: Sequence[TideReading]) -> TideEvents:
+    """Index one station's predictions against its own flood stages."""
+    t0 = predictions[0].timestamp
+    t = np.array([(p.timestamp - t0).total_seconds() for p in predictions], dtype=np.float64)
+    h = np.array([p.prediction_ft for p in predictions], dtype=np.float64)
+
+    def at(seconds: float) -> datetime:
+        return t0 + timedelta(minutes=round(seconds / 60))
+
+    extrema = []
+    high_times = high_heights = np.empty(0)
+    if h.size >= 3:
+        times, heights, is_high = _extrema(t, h)
+        extrema = [
+            TideExtreme(kind="high" if high else "low", time=at(s), height_ft=round(float(y), 2))
+            for s, y, high in zip(times.tolist(), heights.tolist(), is_high.tolist())
+        ]
+        high_times, high_heights = times[is_high], heights[is_high]
+
+    flood = []
+    for stage, level in station.flood_stages_ft.items():
+        starts, ends = _crossings(t, h, level)
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            lo = t[0] if np.isnan(start) else start
+            hi = t[-1] if np.isnan(end) else end
+            # Peak is the fitted high inside the spell, else the highest sample
+            a, b = np.searchsorted(high_times, [lo, hi])
+            if b > a:
+                j = a + int(np.argmax(high_heights[a:b]))
+                peak_s, peak_ft = high_times[j], high_heights[j]
+            else:
+                a, b = np.searchsorted(t, [lo, hi])
+                j = a + int(np.argmax(h[a:b + 1]))
+                peak_s, peak_ft = t[j], h[j]
+            flood.append(
+                FloodInterval(
+                    stage=stage,
+                    threshold_ft=level,
+                    start=None if np.isnan(start) else at(start),
+                    end=None if np.isnan(end) else at(end),
+                    peak_ft=round(float(peak_ft), 2),
+                    peak_time=at(float(peak_s)),
+                )
+            )
+
+    return TideEvents(
+        station_id=station.id,
+        generated_at=datetime.utcnow(),
+        predictions_start=t0,
+        predictions_end=predictions[-1].timestamp,
+        extrema=extrema,
+        flood=flood,
+    )
@@ -0,0 +1,233 @@
+"""
+Record/replay of upstream HTTP traffic (NOAA, NWS, USGS).
+
+With `HTTP_MODE=record`, every upstream response is saved with its timing
+to a gzip'd JSON-lines archive; identical bodies are stored once. With
+`HTTP_MODE=replay`, the shared client is served from the archive instead
+of the network, so a storm's traffic can be played back offline.
+
+Replay runs on a clock that starts at `replay_start_offset_s` into the
+recording and advances `replay_speed` times faster than real time. Each
+request gets the most recent recorded response for the same URL at that
+point, after sleeping for its recorded latency divided by the speed. Timestamps in the
+bodies are moved forward by whole hours so the recording looks current.
+
+Date ranges differ on every call, so `replay_window_params` (NOAA's
+begin/end dates) are matched on their span alone: a 48-hour predictions
+request replays a recorded 48-hour one, never the 168-hour one.
+`replay_ignore_params` are dropped from the match entirely.
+
+Archive lines:
+    {"v": 1, "started": <epoch seconds>}                     header
+    {"b": <body id>, "body": <text>}                          body, first use
+    {"t": <seconds>, "key": ..., "status": ..., "type": ...,
+     "latency_ms": ..., "b": <body id>}                       response
+"""
+
+import asyncio
+import bisect
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode
+
+import httpx
+
+from app import log
+from app.config import settings
+
+ARCHIVE_VERSION = 1
+
+# Date-times as NOAA ("2024-01-01 12:00") and NWS ("2024-01-01T12:00:00+00:00") write them
+_TIMESTAMP = re.compile(r"(\d{4}-\d{2}-\d{2})([T ])(\d{2}:\d{2})(:\d{2})?")
+
+
+def _parse_date(value: str) -> Optional[datetime]:
+    for fmt in ("%Y%m%d %H:%M", "%Y%m%d"):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            pass
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def request_key(request: httpx.Request, ignore: frozenset, window: tuple[str, ...] = ()) -> str:
+    """
+    Method and URL with sorted query params, minus ones that vary per call.
+
+    A (begin, end) `window` pair is replaced by its length in minutes.
+    """
+    url = request.url
+    query_params = parse_qsl(url.query.decode())
+    params = sorted((k, v) for k, v in query_params if k not in ignore and k not in window)
+    if len(window) == 2:
+        values = dict(query_params)
+        begin, end = (_parse_date(values.get(name, "")) for name in window)
+        if begin is not None and end is not None:
+            params = sorted(params + [("window", str(round((end - begin).total_seconds() / 60)))])
+    query = f"?{urlencode(params)}" if params else ""
+    return f"{request.method} {url.scheme}://{url.host}{url.path}{query}"
+
+
+def _split_params(value: str) -> tuple[str, ...]:
+    return tuple(p.strip() for p in value.split(",") if p.strip())
+
+
+def _key_params() -> tuple[frozenset, tuple[str, ...]]:
+    """(ignored params, window params) from the settings."""
+    return frozenset(_split_params(settings.replay_ignore_params)), _split_params(settings.replay_window_params)
+
+
+def shift_timestamps(text: str, delta: timedelta) -> str:
+    """Move every NOAA/NWS-style timestamp in `text` by `delta`, keeping its format."""
+
+    def shift(match: re.Match) -> str:
+        date, sep, hm, seconds = match.groups()
+        moved = datetime.fromisoformat(f"{date} {hm}{seconds or ':00'}") + delta
+        return f"{moved:%Y-%m-%d}{sep}{moved:%H:%M}" + (f":{moved:%S}" if seconds else "")
+
+    return _TIMESTAMP.sub(shift, text)
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Forwards to the network and appends each response to the archive."""
+
+    def __init__(self, path: str, inner: Optional[httpx.AsyncBaseTransport] = None):
+        self._inner = inner or httpx.AsyncHTTPTransport()
+        self._ignore, self._window = _key_params()
+        self._started = time.time()
+        self._bodies: set[str] = set()
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = gzip.open(path, "at", encoding="utf-8")
+        self._write([{"v": ARCHIVE_VERSION, "started": self._started}])
+
+    def _write(self, records: list[dict]):
+        with self._lock:
+            for record in records:
+                self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+            self._file.flush()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        sent = time.time()
+        raw = await self._inner.handle_async_request(request)
+        # Read through a Response so the body is stored decoded (upstreams gzip it)
+        response = httpx.Response(raw.status_code, headers=raw.headers, stream=raw.stream, request=request)
+        await response.aread()
+        await response.aclose()
+        body = response.content
+        latency_ms = (time.time() - sent) * 1000
+
+        text = body.decode("utf-8", errors="replace")
+        body_id = hashlib.sha1(body).hexdigest()[:16]
+        records = []
+        if body_id not in self._bodies:
+            self._bodies.add(body_id)
+            records.append({"b": body_id, "body": text})
+        records.append({
+            "t": round(sent - self._started, 3),
+            "key": request_key(request, self._ignore, self._window),
+            "status": response.status_code,
+            "type": response.headers.get("content-type", ""),
+            "latency_ms": round(latency_ms, 1),
+            "b": body_id,
+        })
+        await asyncio.to_thread(self._write, records)
+
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=[(k, v) for k, v in response.headers.items() if k.lower() not in ("content-encoding", "content-length")],
+            content=body,
+            request=request,
+        )
+
+    async def aclose(self):
+        await self._inner.aclose()
+        with self._lock:
+            self._file.close()
+
+
+class _Entry:
+    __slots__ = ("t", "status", "content_type", "latency_ms", "body_id")
+
+    def __init__(self, record: dict):
+        self.t = record["t"]
+        self.status = record["status"]
+        self.content_type = record["type"]
+        self.latency_ms = record["latency_ms"]
+        self.body_id = record["b"]
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """Serves responses from an archive on a (possibly accelerated) replay clock."""
+
+    def __init__(self, path: str):
+        self._ignore, self._window = _key_params()
+        self._bodies: dict[str, str] = {}
+        self._entries: dict[str, list[_Entry]] = {}
+        self._shifted: dict[str, bytes] = {}
+        started = None
+
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                if "v" in record:
+                    # Later sessions appended to the same file continue its timeline
+                    if started is None:
+                        started = record["started"]
+                    offset = record["started"] - started
+                elif "body" in record:
+                    self._bodies[record["b"]] = record["body"]
+                else:
+                    record["t"] += offset
+                    self._entries.setdefault(record["key"], []).append(_Entry(record))
+        for entries in self._entries.values():
+            entries.sort(key=lambda e: e.t)
+        self._times = {key: [e.t for e in entries] for key, entries in self._entries.items()}
+
+        self._speed = max(settings.replay_speed, 1e-6)
+        self._offset = settings.replay_start_offset_s
+        self._clock_started = time.monotonic()
+        # Whole hours keep NWS hourly intervals and NOAA's 6-minute steps aligned
+        recorded_now = (started or time.time()) + self._offset
+        hours = round((time.time() - recorded_now) / 3600)
+        self._delta = timedelta(hours=hours) if settings.replay_time_shift else timedelta(0)
+        log.info("replay.loaded", path=path, urls=len(self._entries), bodies=len(self._bodies),
+                 shift_hours=hours if settings.replay_time_shift else 0)
+
+    def _clock(self) -> float:
+        return self._offset + (time.monotonic() - self._clock_started) * self._speed
+
+    def _body(self, body_id: str) -> bytes:
+        body = self._shifted.get(body_id)
+        if body is None:
+            text = self._bodies.get(body_id, "")
+            if self._delta:
+                text = shift_timestamps(text, self._delta)
+            body = self._shifted[body_id] = text.encode("utf-8")
+        return body
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        key = request_key(request, self._ignore, self._window)
+        entries = self._entries.get(key)
+        if not entries:
+            log.warning("replay.miss", key=key)
+            return httpx.Response(504, text="Not in replay archive", request=request)
+
+        # Latest response recorded at or before the replay clock (else the first)
+        i = max(bisect.bisect_right(self._times[key], self._clock()) - 1, 0)
+        entry = entries[i]
+        if settings.replay_latency and entry.latency_ms > 0:
+            await asyncio.sleep(entry.latency_ms / 1000 / self._speed)
+
+        headers = {"content-type": entry.content_type} if entry.content_type else {}
+        return httpx.Response(entry.status, headers=headers, content=self._body(entry.body_id), request=request)
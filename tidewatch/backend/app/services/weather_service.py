@@ -1,15 +1,39 @@
-"""National Weather Service API client for Norfolk, VA area."""
+"""
+National Weather Service API client for Norfolk, VA area.
 
+Forecasts are fetched per NWS grid cell (see nws_grid.py) and cached per
+cell. Concurrent requests for the same cell share a single upstream fetch.
+
+Alongside the named-period forecast, hourly series are ingested from the raw
+gridpoint data (falling back to the hourly forecast); see nws_hourly.py.
+When available they supply the risk inputs: rain is the QPF total over the
+next `precip_window_hours` instead of a step function of the precipitation
+chance, and wind is the hourly peak over the same window.
+"""
+
+import asyncio
 import re
-import httpx
-from typing import Optional
-from cachetools import TTLCache
+from typing import TYPE_CHECKING, Awaitable, Callable, Hashable, Optional
+from cachetools import LRUCache, TTLCache
 
+from app import log
 from app.config import settings
 from app.models.schemas import WeatherPeriod, WeatherData
-
-# Cache weather data for 30 minutes
-_weather_cache: TTLCache = TTLCache(maxsize=10, ttl=1800)
+from app.services import nws_grid
+from app.services.http_client import get_client
+from app.services.nws_grid import GridCell
+
+if TYPE_CHECKING:
+    # nws_hourly pulls in NumPy, so it's imported where used to keep boot fast
+    from app.services.nws_hourly import HourlySeries
+
+# Cache weather data for 30 minutes, per grid cell
+_weather_cache: TTLCache = TTLCache(maxsize=settings.nws_cache_size, ttl=1800)
+_hourly_cache: TTLCache = TTLCache(maxsize=settings.nws_cache_size, ttl=1800)
+# Forecast combined with hourly values, reused while both inputs are unchanged
+_combined_cache: LRUCache = LRUCache(maxsize=settings.nws_cache_size)
+# Fetches in progress, so concurrent misses for a cell wait on the same one
+_inflight: dict[Hashable, asyncio.Task] = {}
 
 NWS_HEADERS = {
     "User-Agent": "(TideWatch, tidewatch@example.com)",
@@ -33,19 +57,13 @@ def _parse_precip_chance(period_data: dict) -> int:
     return 0
 
 
-async def get_forecast() -> Optional[WeatherData]:
-    """Fetch weather forecast from NWS for Norfolk grid point."""
-    cache_key = "nws_forecast"
-    if cache_key in _weather_cache:
-        return _weather_cache[cache_key]
-
-    url = f"{settings.nws_base_url}/gridpoints/{settings.nws_office}/{settings.nws_grid_x},{settings.nws_grid_y}/forecast"
+async def _fetch_forecast(cell: GridCell) -> Optional[WeatherData]:
+    url = f"{settings.nws_base_url}/gridpoints/{cell.office}/{cell.x},{cell.y}/forecast"
 
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            resp = await client.get(url, headers=NWS_HEADERS)
-            resp.raise_for_status()
-            data = resp.json()
+        resp = await get_client().get(url, headers=NWS_HEADERS)
+        resp.raise_for_status()
+        data = resp.json()
 
         periods = []
         max_precip = 0
@@ -92,17 +110,105 @@ async def get_forecast() -> Optional[WeatherData]:
             wind_speed_mph=max_wind,
             wind_direction=wind_dir,
         )
-        _weather_cache[cache_key] = weather
+        _weather_cache[cell] = weather
         return weather
 
     except Exception as e:
-        print(f"[NWS] Error fetching forecast: {e}")
+        log.warning("nws.forecast_failed", cell=str(cell), error=str(e))
         return None
 
 
-async def get_weather_data() -> WeatherData:
-    """Get weather data with fallback defaults."""
-    result = await get_forecast()
-    if result is None:
-        return WeatherData()
-    return result
+async def _fetch_series(url: str, parser) -> "HourlySeries":
+    from app.services import nws_hourly
+
+    async with get_client().stream("GET", url, headers=NWS_HEADERS) as resp:
+        resp.raise_for_status()
+        return await nws_hourly.parse_stream(resp.aiter_bytes(), parser)
+
+
+async def _fetch_hourly(cell: GridCell) -> Optional["HourlySeries"]:
+    from app.services import nws_hourly
+
+    base = f"{settings.nws_base_url}/gridpoints/{cell.office}/{cell.x},{cell.y}"
+    try:
+        series = await _fetch_series(base, nws_hourly.GridpointParser())
+    except Exception as e:
+        log.warning("nws.gridpoint_failed", cell=str(cell), error=str(e))
+        try:
+            series = await _fetch_series(f"{base}/forecast/hourly", nws_hourly.HourlyForecastParser())
+        except Exception as e:
+            log.warning("nws.hourly_failed", cell=str(cell), error=str(e))
+            return None
+    _hourly_cache[cell] = series
+    return series
+
+
+def _single_flight(key: Hashable, fetch: Callable[[], Awaitable]) -> Awaitable:
+    task = _inflight.get(key)
+    if task is None:
+        task = _inflight[key] = asyncio.create_task(fetch())
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    # Shielded so one caller going away doesn't cancel the fetch for the rest
+    return asyncio.shield(task)
+
+
+async def get_forecast(cell: Optional[GridCell] = None) -> Optional[WeatherData]:
+    """Fetch the weather forecast for a grid cell (default: the Norfolk cell)."""
+    cell = cell or nws_grid.default_cell()
+    if cell in _weather_cache:
+        return _weather_cache[cell]
+    return await _single_flight(("forecast", cell), lambda: _fetch_forecast(cell))
+
+
+async def get_hourly(cell: Optional[GridCell] = None) -> Optional["HourlySeries"]:
+    """Fetch hourly QPF, wind, precipitation chance and temperature for a grid cell."""
+    cell = cell or nws_grid.default_cell()
+    if cell in _hourly_cache:
+        return _hourly_cache[cell]
+    return await _single_flight(("hourly", cell), lambda: _fetch_hourly(cell))
+
+
+def _apply_hourly(weather: WeatherData, hourly: "HourlySeries") -> WeatherData:
+    from app.services import nws_hourly
+
+    hours = settings.precip_window_hours
+    update = {}
+    precip = nws_hourly.precipitation_total(hourly, hours)
+    if precip is not None:
+        update["precipitation_forecast_in"] = precip
+    wind = nws_hourly.peak_wind(hourly, hours)
+    if wind is not None:
+        update["wind_speed_mph"], update["wind_direction"] = wind
+    return weather.model_copy(update=update) if update else weather
+
+
+async def get_weather_data(
+    latitude: Optional[float] = None,
+    longitude: Optional[float] = None,
+    cell: Optional[GridCell] = None,
+) -> WeatherData:
+    """Get weather data for a location or grid cell, with fallback defaults."""
+    cell = cell or nws_grid.grid_cell(latitude, longitude)
+    forecast, hourly = await asyncio.gather(get_forecast(cell), get_hourly(cell))
+    if hourly is None:
+        return forecast if forecast is not None else WeatherData()
+
+    # Return the same combined object while both inputs are the cached ones
+    entry = _combined_cache.get(cell)
+    if entry is None or entry[0] is not forecast or entry[1] is not hourly:
+        weather = _apply_hourly(forecast if forecast is not None else WeatherData(), hourly)
+        entry = _combined_cache[cell] = (forecast, hourly, weather)
+    return entry[2]
+
+
+async def prefetch_city_cells() -> int:
+    """Fill the cache for every grid cell covering the city; returns cells fetched."""
+    semaphore = asyncio.Semaphore(settings.nws_prefetch_concurrency)
+
+    async def fetch(cell: GridCell) -> bool:
+        async with semaphore:
+            forecast, _ = await asyncio.gather(get_forecast(cell), get_hourly(cell))
+            return forecast is not None
+
+    results = await asyncio.gather(*(fetch(cell) for cell in nws_grid.city_cells()))
+    return sum(results)
@@ -0,0 +1,68 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.routers import alert_router
+
+app = FastAPI()
+app.include_router(alert_router.router)
+client = TestClient(app)
+
+AREA = {"latitude": 36.85, "longitude": -76.29, "radius_m": 100}
+
+
+def test_admin_endpoint_is_disabled_without_a_token(monkeypatch):
+    monkeypatch.setattr(settings, "admin_token", "")
+    assert client.post("/api/alerts/admin/area", json=AREA).status_code == 503
+
+
+def test_admin_endpoint_requires_the_token(monkeypatch):
+    monkeypatch.setattr(settings, "admin_token", "s3cret")
+    assert client.post("/api/alerts/admin/area", json=AREA).status_code == 403
+    assert client.post("/api/alerts/admin/area", json=AREA, headers={"X-Admin-Token": "wrong"}).status_code == 403
+    response = client.post("/api/alerts/admin/area", json=AREA, headers={"X-Admin-Token": "s3cret"})
+    assert response.status_code == 200
+    assert response.json()["matched"] == 0
+
+
+def test_area_alert_bounds_concurrent_fetches(monkeypatch):
+    import asyncio
+
+    from app.models.schemas import AlertSubscription, ElevationData, RiskFactors, RiskScore
+    from app.services import notification_service
+
+    monkeypatch.setattr(settings, "admin_token", "s3cret")
+    monkeypatch.setattr(settings, "area_alert_concurrency", 3)
+    active = peak = 0
+
+    async def fake_snapshot(latitude, longitude):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return None
+
+    async def fake_elevation(latitude, longitude):
+        return ElevationData(latitude=latitude, longitude=longitude, elevation_ft=10.0)
+
+    risk = RiskScore(score=10, grade="A", summary="", factors=RiskFactors(
+        tidal_factor=0, elevation_factor=0, precipitation_factor=0, wind_surge_factor=0))
+    monkeypatch.setattr(alert_router.snapshot_service, "get_snapshot", fake_snapshot)
+    monkeypatch.setattr(alert_router.elevation_service, "get_elevation", fake_elevation)
+    monkeypatch.setattr(alert_router.snapshot_service, "get_risk", lambda snapshot, elevation: risk)
+
+    phones = [f"+1555000{i:04d}" for i in range(20)]
+    for phone in phones:
+        notification_service.subscribe(
+            AlertSubscription(phone_number=phone, address="x", latitude=36.85, longitude=-76.29)
+        )
+    try:
+        response = client.post("/api/alerts/admin/area", json=AREA, headers={"X-Admin-Token": "s3cret"})
+    finally:
+        for phone in phones:
+            notification_service.unsubscribe(phone)
+
+    assert response.status_code == 200
+    assert response.json()["matched"] == 20
+    assert peak == 3
@@ -0,0 +1,30 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from app.cli import _BOOT_PROBE
+from app.config import settings
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUNS = 3
+
+
+def _probe() -> tuple[float, dict]:
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-c", _BOOT_PROBE], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    return (time.perf_counter() - started) * 1000, json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def test_cold_boot_is_within_budget_and_defers_heavy_imports():
+    runs = [_probe() for _ in range(RUNS)]
+
+    median_ms = statistics.median(wall_ms for wall_ms, _ in runs)
+    assert median_ms <= settings.boot_budget_ms, f"boot took {median_ms:.0f} ms (budget {settings.boot_budget_ms} ms)"
+
+    loaded = sorted({name for _, report in runs for name, is_loaded in report["loaded"].items() if is_loaded})
+    assert not loaded, f"deferred modules imported at boot: {', '.join(loaded)}"
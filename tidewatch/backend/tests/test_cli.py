@@ -0,0 +1,30 @@
+import pytest
+
+from app import cli
+
+pa = pytest.importorskip("pyarrow")
+pytest.importorskip("pyarrow.parquet")
+
+
+def _row(parcel, **result):
+    return {"parcel_id": parcel, "latitude": "36.85", "longitude": "-76.29",
+            **{col: None for col in cli.RESULT_COLUMNS}, **result}
+
+
+def test_parquet_output_schema_does_not_depend_on_the_first_chunk(tmp_path):
+    source = tmp_path / "parcels.csv"
+    source.write_text("parcel_id,latitude,longitude,elevation_ft\n")
+    output = tmp_path / "scored.parquet"
+
+    writer = cli.open_writer(str(output), str(source))
+    writer.write([_row("skipped")])  # Every result column null
+    writer.write([_row("scored", elevation_ft=8.5, elevation_source="USGS", tide_station="8638610",
+                       score=42.0, grade="C", confidence=0.7, tidal_factor=0.5, elevation_factor=0.4,
+                       precipitation_factor=0.1, wind_surge_factor=0.2)])
+    writer.close()
+
+    table = pa.parquet.read_table(str(output))
+    assert table.schema.field("parcel_id").type == pa.string()
+    assert table.schema.field("elevation_ft").type == pa.float64()
+    assert table.schema.field("grade").type == pa.string()
+    assert table.column("score").to_pylist() == [None, 42.0]
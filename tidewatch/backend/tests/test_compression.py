@@ -0,0 +1,101 @@
+import gzip
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app import compression
+from app.compression import CompressionMiddleware, PrecompressedBody, choose_encoding
+from app.config import settings
+
+
+@pytest.fixture
+def no_brotli(monkeypatch):
+    monkeypatch.setattr(compression, "_brotli", lambda: None)
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("", None),
+    ("gzip", "gzip"),
+    ("deflate", None),
+    ("GZIP;q=0.5, br", "gzip"),
+    ("gzip;q=0", None),
+    ("*", "gzip"),
+    ("*, gzip;q=0", None),
+])
+def test_choose_encoding_without_brotli(no_brotli, header, expected):
+    assert choose_encoding(header) == expected
+
+
+def test_brotli_is_preferred_when_installed(monkeypatch):
+    monkeypatch.setattr(compression, "_brotli", lambda: object())
+    assert choose_encoding("gzip, br") == "br"
+    assert choose_encoding("gzip, br;q=0") == "gzip"
+    assert choose_encoding("br;q=0.5, gzip") == "gzip"
+    assert choose_encoding("br;q=0.8, gzip;q=0.8") == "br"
+    assert choose_encoding("*;q=0.5, gzip;q=0.4") == "br"
+
+
+def test_precompressed_body_compresses_each_encoding_once(no_brotli, monkeypatch):
+    calls = []
+    real = compression.compress
+    monkeypatch.setattr(compression, "compress", lambda body, enc, shared=False: calls.append(enc) or real(body, enc, shared))
+
+    body = b'{"v": "' + b"x" * settings.compression_min_bytes + b'"}'
+    payload = PrecompressedBody(body)
+    first = payload.variant("gzip")
+    assert payload.variant("gzip") is first
+    assert gzip.decompress(first) == body
+    assert calls == ["gzip"]
+    assert payload.variant(None) is body
+    assert PrecompressedBody(b"{}").variant("gzip") == b"{}"  # Under the threshold
+
+
+def _app():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware)
+    big = {"v": "x" * settings.compression_min_bytes}
+
+    @app.get("/big")
+    async def big_json():
+        return JSONResponse(big)
+
+    @app.get("/small")
+    async def small_json():
+        return JSONResponse({"v": 1})
+
+    @app.get("/text")
+    async def text():
+        return PlainTextResponse("y" * settings.compression_min_bytes * 2)
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            yield b"data: " + b"z" * settings.compression_min_bytes + b"\n\n"
+        return StreamingResponse(chunks(), media_type="text/event-stream")
+
+    @app.get("/shared")
+    async def shared(request: Request):
+        return compression.respond(request, PrecompressedBody(JSONResponse(big).body))
+
+    return app
+
+
+def test_middleware_compresses_only_what_it_should(no_brotli):
+    client = TestClient(_app())
+    gz = {"Accept-Encoding": "gzip"}
+
+    response = client.get("/big", headers=gz)
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.json()["v"].startswith("x")
+
+    assert "content-encoding" not in client.get("/small", headers=gz).headers
+    assert client.get("/text", headers=gz).headers["content-encoding"] == "gzip"
+    assert "content-encoding" not in client.get("/stream", headers=gz).headers
+    assert "content-encoding" not in client.get("/big", headers={"Accept-Encoding": "identity"}).headers
+
+    shared = client.get("/shared", headers=gz)
+    assert shared.headers["content-encoding"] == "gzip"  # Precompressed, not compressed twice
+    assert shared.json()["v"].startswith("x")
@@ -0,0 +1,54 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from starlette.requests import Request
+
+from app.models.schemas import Dashboard
+from app.routers import dashboard_router
+
+
+def _request() -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/api/dashboard", "headers": []})
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(dashboard_router, "_generation", None)
+    monkeypatch.setattr(dashboard_router, "_dashboard", None)
+    monkeypatch.setattr(dashboard_router, "_rendered", {})
+    monkeypatch.setattr(dashboard_router, "_build", lambda generation, default, samples: Dashboard(generation=generation))
+
+
+def _gathers(monkeypatch, *rounds):
+    """Each round is (default generation, [sample generations])."""
+    pending = list(rounds)
+
+    async def gather():
+        default, samples = pending.pop(0)
+        return SimpleNamespace(generation=default), [(SimpleNamespace(generation=g), None) for g in samples]
+
+    monkeypatch.setattr(dashboard_router, "_gather", gather)
+    return pending
+
+
+def test_etag_uses_the_generation_of_the_gathered_snapshots(monkeypatch):
+    _gathers(monkeypatch, (4, [4, 4]))
+    # A refresh after the gather must not relabel the data
+    monkeypatch.setattr(dashboard_router.snapshot_service, "current_generation", lambda: 5, raising=False)
+    response = asyncio.run(dashboard_router.get_dashboard(_request()))
+    assert response.headers["etag"].split("-")[1] == "4"
+
+
+def test_mixed_generations_are_regathered(monkeypatch):
+    pending = _gathers(monkeypatch, (4, [5, 5]), (5, [5, 5]))
+    response = asyncio.run(dashboard_router.get_dashboard(_request()))
+    assert not pending
+    assert response.headers["etag"].split("-")[1] == "5"
+
+
+def test_still_mixed_generations_are_not_cached(monkeypatch):
+    _gathers(monkeypatch, (4, [5, 5]), (5, [6, 6]))
+    response = asyncio.run(dashboard_router.get_dashboard(_request()))
+    assert "etag" not in response.headers
+    assert dashboard_router._generation is None
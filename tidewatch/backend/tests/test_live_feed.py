@@ -0,0 +1,38 @@
+import asyncio
+
+import pytest
+
+from app.routers import live_router
+from app.services.live_feed import LiveFeed
+
+
+def test_failed_initial_refresh_releases_the_slot(monkeypatch):
+    feed = LiveFeed()
+
+    async def failing_refresh(channel, shared):
+        raise RuntimeError("upstream down")
+
+    monkeypatch.setattr(feed, "_refresh_channel", failing_refresh)
+    with pytest.raises(RuntimeError):
+        asyncio.run(feed.subscribe(36.85, -76.29))
+    assert feed.connections == 0
+    assert not feed._channels
+
+
+def test_sse_slot_is_released_even_if_streaming_never_starts(monkeypatch):
+    feed = LiveFeed()
+
+    async def no_refresh(channel, shared):
+        return []
+
+    monkeypatch.setattr(feed, "_refresh_channel", no_refresh)
+    monkeypatch.setattr(live_router, "feed", feed)
+
+    async def run():
+        response = await live_router.stream_risk(request=None, latitude=36.85, longitude=-76.29)
+        assert feed.connections == 1
+        await response.background()  # What Starlette runs after the response, streamed or not
+        feed.unsubscribe(next(iter(response.background.args)))  # Idempotent with the generator's finally
+
+    asyncio.run(run())
+    assert feed.connections == 0
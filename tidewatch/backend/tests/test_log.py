@@ -0,0 +1,39 @@
+import io
+import json
+
+import pytest
+
+from app import log
+
+
+@pytest.fixture
+def captured(monkeypatch):
+    monkeypatch.setattr(log, "_limiter", log._RateLimiter(window_seconds=60, burst=3))
+    stream = io.StringIO()
+    log.set_stream(stream)
+
+    def entries():
+        log.shutdown()  # Flushes the writer thread
+        return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+    yield entries
+    log.set_stream(io.StringIO())
+
+
+def test_repeated_warnings_are_suppressed(captured):
+    for _ in range(5):
+        log.warning("test.upstream_failed", error="timeout")
+    log.warning("test.upstream_failed", error="refused")
+    entries = captured()
+    assert [e["error"] for e in entries] == ["timeout", "refused"]
+    assert entries[1]["suppressed"] == 4
+
+
+def test_audit_events_are_never_suppressed(captured):
+    for _ in range(20):
+        log.info("alerts.sent", sid="SM1", phone="+15550100")
+    for i in range(20):
+        log.error("alerts.send_failed", phone=f"+1555010{i}", error="boom")
+    entries = captured()
+    assert sum(e["event"] == "alerts.sent" for e in entries) == 20
+    assert sum(e["event"] == "alerts.send_failed" for e in entries) == 20
@@ -0,0 +1,76 @@
+import asyncio
+import math
+from datetime import datetime, timedelta
+
+import httpx
+
+from app.services import noaa_service
+
+STATION = "9999901"
+
+
+def _predictions_upstream(request: httpx.Request) -> httpx.Response:
+    begin = datetime.strptime(request.url.params["begin_date"], "%Y%m%d %H:%M").replace(minute=0)
+    end = datetime.strptime(request.url.params["end_date"], "%Y%m%d %H:%M")
+    hours = int((end - begin).total_seconds() // 3600)
+    return httpx.Response(200, json={"predictions": [
+        {"t": f"{begin + timedelta(hours=i):%Y-%m-%d %H:%M}", "v": f"{3 + 3 * math.cos(2 * math.pi * i / 12.42):.3f}"}
+        for i in range(hours)
+    ]})
+
+
+def test_short_prediction_fetch_keeps_the_event_index(monkeypatch):
+    client = httpx.AsyncClient(transport=httpx.MockTransport(_predictions_upstream))
+    monkeypatch.setattr(noaa_service, "get_client", lambda: client)
+    monkeypatch.setattr(noaa_service, "_event_listeners", [])
+    monkeypatch.setattr(noaa_service, "_tide_caches", {})
+    monkeypatch.setattr(noaa_service, "_tide_events", {})
+
+    async def run():
+        events = await noaa_service.get_tide_events(STATION)
+        await noaa_service.get_tide_predictions(2, STATION)
+        return events, noaa_service.cached_tide_events(STATION)
+
+    before, after = asyncio.run(run())
+    assert len(before.extrema) >= 7
+    assert after is before
+
+
+def test_blended_tide_is_reused_while_gauge_readings_are_unchanged(monkeypatch):
+    from app.config import settings
+    from app.models.schemas import TideData, TideReading
+
+    monkeypatch.setattr(settings, "tide_blend_stations", 2)
+    monkeypatch.setattr(settings, "tide_blend_radius_m", 50_000.0)
+    monkeypatch.setattr(noaa_service, "_blends", noaa_service.LRUCache(maxsize=16))
+    now = datetime(2024, 9, 10, 12, 0)
+    readings = {}
+
+    def reading(station_id, level):
+        return TideReading(timestamp=now, water_level_ft=level, prediction_ft=0.0, station_id=station_id)
+
+    async def current(station_id=None):
+        return readings.setdefault(station_id, reading(station_id, 3.0 + len(readings)))
+
+    predictions = []
+
+    async def tide_data(station_id=None):
+        return TideData(current=await current(station_id), predictions=predictions, station_id=station_id)
+
+    monkeypatch.setattr(noaa_service, "get_current_water_level", current)
+    monkeypatch.setattr(noaa_service, "get_tide_data", tide_data)
+
+    async def run():
+        first = await noaa_service.get_tide_data_for_location(36.90, -76.32)
+        again = await noaa_service.get_tide_data_for_location(36.90, -76.32)
+        for station_id, r in list(readings.items()):
+            readings[station_id] = reading(station_id, r.water_level_ft + 1)
+        refreshed = await noaa_service.get_tide_data_for_location(36.90, -76.32)
+        return first, again, refreshed
+
+    first, again, refreshed = asyncio.run(run())
+    assert first.blend_weights is not None and "+" in first.station_id
+    assert again is first
+    assert refreshed is not first
+    assert refreshed.current.water_level_ft == round(first.current.water_level_ft + 1, 3)
+    assert noaa_service.tide_key(first) == noaa_service.tide_key(refreshed)
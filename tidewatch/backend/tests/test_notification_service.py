@@ -0,0 +1,106 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from app.models.schemas import AlertSubscription, FloodInterval, TideEvents
+from app.services import noaa_service, notification_service
+
+# Sewells Point (8638610) and Portsmouth (8638660) are each the nearest gauge here
+NEAR_SEWELLS = (36.94, -76.33)
+NEAR_PORTSMOUTH = (36.82, -76.29)
+
+
+def _subscribe(phone, location, grade="C"):
+    notification_service.subscribe(AlertSubscription(
+        phone_number=phone, address=phone, latitude=location[0], longitude=location[1], threshold_grade=grade,
+    ))
+
+
+def test_subscribers_are_grouped_by_nearest_station():
+    _subscribe("+15550100", NEAR_SEWELLS)
+    _subscribe("+15550101", NEAR_PORTSMOUTH)
+    try:
+        assert "+15550100" in notification_service._subscribers_by_station["8638610"]
+        assert "+15550101" in notification_service._subscribers_by_station["8638660"]
+        _subscribe("+15550100", NEAR_PORTSMOUTH)  # Moving re-files it
+        assert "+15550100" not in notification_service._subscribers_by_station.get("8638610", set())
+        assert "+15550100" in notification_service._subscribers_by_station["8638660"]
+    finally:
+        notification_service.unsubscribe("+15550100")
+        notification_service.unsubscribe("+15550101")
+    assert "+15550100" not in notification_service._subscriber_station
+
+
+def test_high_water_alert_goes_to_the_station_subscribers_at_or_below_the_stage(monkeypatch):
+    start = datetime.utcnow() + timedelta(hours=3)
+    interval = FloodInterval(stage="minor", threshold_ft=4.5, start=start, end=start + timedelta(hours=2),
+                             peak_ft=5.0, peak_time=start + timedelta(hours=1))
+    events = TideEvents(station_id="8638610", generated_at=datetime.utcnow(), predictions_start=datetime.utcnow(),
+                        predictions_end=start + timedelta(hours=48), flood=[interval])
+    monkeypatch.setattr(noaa_service, "_tide_events", {"8638610": events})
+    sent = []
+
+    async def deliver(phone, text):
+        sent.append(phone)
+        return True
+
+    monkeypatch.setattr(notification_service, "_deliver", deliver)
+    _subscribe("+15550200", NEAR_SEWELLS, "C")
+    _subscribe("+15550201", NEAR_SEWELLS, "F")  # Only wants major flooding
+    _subscribe("+15550202", NEAR_PORTSMOUTH, "C")  # Other gauge
+    try:
+        asyncio.run(notification_service._send_high_water_alerts("8638610", 4.5, start))
+    finally:
+        for phone in ("+15550200", "+15550201", "+15550202"):
+            notification_service.unsubscribe(phone)
+    assert sent == ["+15550200"]
+
+
+def test_twilio_sends_run_concurrently(monkeypatch):
+    class Messages:
+        def create(self, **kwargs):
+            time.sleep(0.2)
+            return type("Message", (), {"sid": "SM1"})()
+
+    class Client:
+        messages = Messages()
+
+    monkeypatch.setattr(notification_service, "_get_twilio_client", lambda: Client())
+
+    async def run():
+        return await asyncio.gather(*(notification_service._deliver(f"+1555030{i}", "hi") for i in range(5)))
+
+    started = time.perf_counter()
+    assert asyncio.run(run()) == [True] * 5
+    assert time.perf_counter() - started < 0.6
+
+
+def test_shifted_crossing_is_not_scheduled_twice(monkeypatch):
+    jobs = []
+
+    class Scheduler:
+        def add_job(self, func, trigger, **kwargs):
+            jobs.append(kwargs["id"])
+
+    monkeypatch.setattr(notification_service, "_get_scheduler", lambda: Scheduler())
+    monkeypatch.setattr(notification_service, "_scheduled", {})
+    # Just before midnight, so a small shift also changes the crossing's date
+    start = (datetime.utcnow() + timedelta(days=1)).replace(hour=23, minute=55, second=0, microsecond=0)
+
+    def events(*starts):
+        return TideEvents(
+            station_id="8638610", generated_at=datetime.utcnow(), predictions_start=datetime.utcnow(),
+            predictions_end=start + timedelta(hours=48),
+            flood=[
+                FloodInterval(stage="minor", threshold_ft=4.5, start=s, end=s + timedelta(hours=2),
+                              peak_ft=5.0, peak_time=s + timedelta(hours=1))
+                for s in starts
+            ],
+        )
+
+    notification_service.schedule_tide_alerts(events(start))
+    notification_service.schedule_tide_alerts(events(start + timedelta(minutes=12)))
+    assert len(jobs) == 1
+    # The next flood tide, ~12.4 h on, is its own alert
+    notification_service.schedule_tide_alerts(events(start + timedelta(minutes=12), start + timedelta(hours=12, minutes=25)))
+    assert len(jobs) == 2
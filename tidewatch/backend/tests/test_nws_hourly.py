@@ -0,0 +1,76 @@
+import asyncio
+import json
+import math
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from app.services import nws_hourly
+
+START = datetime(2024, 9, 10, 12, tzinfo=timezone.utc)
+START_HOUR = math.floor(START.timestamp() / 3600)
+
+GRIDPOINT = {"properties": {
+    "quantitativePrecipitation": {"uom": "wmoUnit:mm", "values": [
+        {"validTime": "2024-09-10T12:00:00+00:00/PT6H", "value": 152.4},
+        {"validTime": "2024-09-10T18:00:00+00:00/PT6H", "value": None},
+    ]},
+    "temperature": {"values": [
+        {"validTime": "2024-09-10T14:00:00+00:00/P1DT6H", "value": 20.0},
+    ], "uom": "wmoUnit:degC"},  # Unit after the values, as NWS sometimes sends it
+    "windSpeed": {"uom": "wmoUnit:km_h-1", "values": [
+        {"validTime": "2024-09-10T08:00:00-04:00/PT3H", "value": 16.09344},
+    ]},
+    "windDirection": {"uom": "wmoUnit:degree_(angle)", "values": [
+        {"validTime": "2024-09-10T12:00:00+00:00/PT1H30M", "value": 225},
+    ]},
+}}
+
+
+@pytest.mark.parametrize("valid_time, hours", [
+    ("2024-09-10T12:00:00+00:00/PT1H", 1),
+    ("2024-09-10T12:00:00+00:00/PT6H", 6),
+    ("2024-09-10T12:00:00+00:00/P1D", 24),
+    ("2024-09-10T12:00:00+00:00/P1DT6H", 30),
+    ("2024-09-10T12:00:00+00:00/PT1H30M", 2),
+    ("2024-09-10T12:00:00+00:00", 1),
+])
+def test_parse_valid_time(valid_time, hours):
+    assert nws_hourly.parse_valid_time(valid_time) == (START_HOUR, hours)
+
+
+def test_parse_valid_time_rejects_unknown_durations():
+    with pytest.raises(ValueError):
+        nws_hourly.parse_valid_time("2024-09-10T12:00:00+00:00/P1W")
+
+
+async def _chunks(body: bytes, size: int = 64):
+    for i in range(0, len(body), size):
+        yield body[i:i + size]
+
+
+@pytest.mark.parametrize("streaming", [True, False])
+def test_gridpoint_intervals_expand_onto_hours(monkeypatch, streaming):
+    monkeypatch.setattr(nws_hourly, "_current_hour", lambda: START_HOUR)
+    if not streaming:
+        monkeypatch.setattr(nws_hourly, "_optional_ijson", lambda: None)
+
+    body = json.dumps(GRIDPOINT).encode()
+    series = asyncio.run(nws_hourly.parse_stream(_chunks(body), nws_hourly.GridpointParser(hours=48)))
+
+    assert series.start == START
+    # 152.4 mm over six hours: one inch in each
+    np.testing.assert_allclose(series.qpf_in[:6], 1.0, rtol=1e-6)
+    assert np.isnan(series.qpf_in[6:]).all()
+    assert nws_hourly.precipitation_total(series, 24) == 6.0
+
+    # 20 degC repeated over the 30 hours from 14:00
+    assert np.isnan(series.temperature_f[:2]).all()
+    np.testing.assert_allclose(series.temperature_f[2:32], 68.0, rtol=1e-6)
+    assert np.isnan(series.temperature_f[32:]).all()
+
+    # 16.09 km/h from 08:00 EDT (12:00 UTC) for three hours
+    np.testing.assert_allclose(series.wind_speed_mph[:3], 10.0, rtol=1e-4)
+    np.testing.assert_allclose(series.wind_direction_deg[:2], 225.0)
+    assert nws_hourly.peak_wind(series, 24) == (10.0, "SW")
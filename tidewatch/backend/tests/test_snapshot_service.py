@@ -0,0 +1,39 @@
+import asyncio
+
+from app.models.schemas import ElevationData, TideData, WeatherData
+from app.services import noaa_service, nws_grid, snapshot_service, weather_service
+
+
+def test_weather_change_in_one_cell_keeps_other_cells_cached(monkeypatch):
+    monkeypatch.setattr(snapshot_service, "_last_seen", {})
+    monkeypatch.setattr(snapshot_service, "_versions", {})
+    monkeypatch.setattr(snapshot_service, "_risk_cache", snapshot_service.LRUCache(maxsize=64))
+    tide = TideData()
+    weather = {"a": WeatherData(), "b": WeatherData()}
+
+    async def tide_data(*args):
+        return tide
+
+    async def weather_data(cell=None):
+        return weather[cell]
+
+    monkeypatch.setattr(noaa_service, "get_tide_data_for_location", tide_data)
+    monkeypatch.setattr(nws_grid, "grid_cell", lambda latitude, longitude: "a" if latitude < 37 else "b")
+    monkeypatch.setattr(weather_service, "get_weather_data", weather_data)
+    scored = []
+    monkeypatch.setattr(snapshot_service, "calculate_risk", lambda t, w, e: scored.append(w) or object())
+    elevation = ElevationData(latitude=0.0, longitude=0.0, elevation_ft=8.0)
+
+    def risks():
+        a = asyncio.run(snapshot_service.get_snapshot(36.9, -76.3))
+        b = asyncio.run(snapshot_service.get_snapshot(37.2, -76.5))
+        return snapshot_service.get_risk(a, elevation), snapshot_service.get_risk(b, elevation), b.generation
+
+    first_a, first_b, generation = risks()
+    weather["b"] = WeatherData(precipitation_forecast_in=1.5)
+    second_a, second_b, next_generation = risks()
+
+    assert second_a is first_a
+    assert second_b is not first_b
+    assert len(scored) == 3 and scored[-1] is weather["b"]
+    assert next_generation == generation + 1
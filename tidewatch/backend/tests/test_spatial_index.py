@@ -0,0 +1,57 @@
+import random
+
+from app.services.spatial_index import GridIndex, haversine_m, point_in_polygon
+
+
+def _random_index(n=400, seed=3):
+    rng = random.Random(seed)
+    index = GridIndex()
+    points = {}
+    for i in range(n):
+        lat, lon = rng.uniform(36.7, 37.1), rng.uniform(-76.5, -76.1)
+        index.insert(i, lat, lon)
+        points[i] = (lat, lon)
+    return index, points
+
+
+def test_nearest_matches_brute_force():
+    index, points = _random_index()
+    rng = random.Random(11)
+    for _ in range(50):
+        lat, lon = rng.uniform(36.6, 37.2), rng.uniform(-76.6, -76.0)
+        k = rng.randint(1, 10)
+        expected = sorted(points, key=lambda key: haversine_m(lat, lon, *points[key]))[:k]
+        found = index.nearest(lat, lon, k)
+        assert [key for key, _ in found] == expected
+        assert [d for _, d in found] == sorted(d for _, d in found)
+
+
+def test_nearest_handles_small_and_far_queries():
+    index = GridIndex()
+    assert index.nearest(36.85, -76.29) == []
+    index.insert("a", 36.85, -76.29)
+    # Far outside any cell near the point, and k larger than the index
+    assert [key for key, _ in index.nearest(40.0, -70.0, k=5)] == ["a"]
+
+
+def test_insert_moves_and_remove_forgets():
+    index = GridIndex()
+    index.insert("a", 36.85, -76.29)
+    index.insert("a", 36.95, -76.33)
+    assert len(index) == 1
+    assert index.query_radius(36.85, -76.29, 500) == []
+    assert index.query_radius(36.95, -76.33, 500) == ["a"]
+    assert index.remove("a") and not index.remove("a")
+    assert index.nearest(36.95, -76.33) == []
+
+
+def test_radius_and_polygon_match_brute_force():
+    index, points = _random_index()
+    center, radius = (36.9, -76.3), 5000
+    assert sorted(index.query_radius(*center, radius)) == sorted(
+        key for key, p in points.items() if haversine_m(*center, *p) <= radius
+    )
+    polygon = [(36.8, -76.4), (37.0, -76.35), (36.95, -76.2), (36.82, -76.25)]
+    assert sorted(index.query_polygon(polygon)) == sorted(
+        key for key, p in points.items() if point_in_polygon(*p, polygon)
+    )
@@ -0,0 +1,96 @@
+import math
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.schemas import TideReading, TideStation
+from app.services import tide_events
+
+T0 = datetime(2024, 9, 10, 0, 0)
+PERIOD_H = 12.42  # M2 tide
+PHASE_H = 3.2  # First high tide
+MEAN_FT, AMPLITUDE_FT = 3.0, 3.0
+STATION = TideStation(id="8638610", name="Sewells Point, VA", latitude=36.9467, longitude=-76.3300,
+                      flood_stages_ft={"minor": 4.5, "moderate": 5.5, "major": 6.5})
+
+
+def _height(hours: float) -> float:
+    return MEAN_FT + AMPLITUDE_FT * math.cos(2 * math.pi * (hours - PHASE_H) / PERIOD_H)
+
+
+def _predictions(heights):
+    return [
+        TideReading(timestamp=T0 + timedelta(hours=i), water_level_ft=0.0, prediction_ft=h, station_id="8638610")
+        for i, h in enumerate(heights)
+    ]
+
+
+def _hours(t: datetime) -> float:
+    return (t - T0).total_seconds() / 3600
+
+
+@pytest.fixture
+def events():
+    return tide_events.build(STATION, _predictions([round(_height(i), 3) for i in range(48)]))
+
+
+def test_extrema_land_between_hourly_samples(events):
+    highs = [e for e in events.extrema if e.kind == "high"]
+    lows = [e for e in events.extrema if e.kind == "low"]
+    # The fourth low (46.7 h) has no sample after it to bracket it
+    assert len(highs) == 4 and len(lows) == 3
+    for k, high in enumerate(highs):
+        assert abs(_hours(high.time) - (PHASE_H + k * PERIOD_H)) <= 3 / 60
+        assert high.height_ft == pytest.approx(MEAN_FT + AMPLITUDE_FT, abs=0.03)
+    for k, low in enumerate(lows):
+        assert abs(_hours(low.time) - (PHASE_H + (k + 0.5) * PERIOD_H)) <= 3 / 60
+        assert low.height_ft == pytest.approx(MEAN_FT - AMPLITUDE_FT, abs=0.03)
+    times = [e.time for e in events.extrema]
+    assert times == sorted(times)
+
+
+def test_crossings_are_interpolated_and_paired(events):
+    stages = {stage: [i for i in events.flood if i.stage == stage] for stage in ("minor", "moderate", "major")}
+    assert not stages["major"]  # Peak is 6.0 ft
+    for stage, level in (("minor", 4.5), ("moderate", 5.5)):
+        # cos(x) = (level - mean) / amplitude on either side of each high
+        half_width = math.acos((level - MEAN_FT) / AMPLITUDE_FT) * PERIOD_H / (2 * math.pi)
+        assert len(stages[stage]) == 4
+        for k, interval in enumerate(stages[stage]):
+            peak = PHASE_H + k * PERIOD_H
+            # Linear between hourly samples; the curve near a high bends it a few minutes
+            assert abs(_hours(interval.start) - (peak - half_width)) <= 8 / 60
+            assert abs(_hours(interval.end) - (peak + half_width)) <= 8 / 60
+            assert abs(_hours(interval.peak_time) - peak) <= 3 / 60
+            assert interval.threshold_ft == level
+
+
+def test_open_ended_spells():
+    events = tide_events.build(STATION, _predictions([5.0, 4.8, 4.0, 3.5, 4.0, 4.9, 5.2]))
+    minor = [i for i in events.flood if i.stage == "minor"]
+    assert minor[0].start is None and minor[0].end is not None
+    assert minor[-1].start is not None and minor[-1].end is None
+    # No fitted high inside the final spell, so its peak is the last sample
+    assert minor[-1].peak_ft == 5.2 and minor[-1].peak_time == T0 + timedelta(hours=6)
+
+
+def test_flat_top_puts_the_high_mid_plateau():
+    events = tide_events.build(STATION, _predictions([1.0, 3.0, 3.0, 1.0]))
+    (high,) = events.extrema
+    assert high.kind == "high"
+    assert high.time == T0 + timedelta(hours=1, minutes=30)
+
+
+def test_too_short_for_extrema():
+    events = tide_events.build(STATION, _predictions([1.0, 2.0]))
+    assert events.extrema == []
+    assert events.predictions_end == T0 + timedelta(hours=1)
+
+
+def test_stages_come_from_the_station():
+    heights = _predictions([round(_height(i), 3) for i in range(48)])
+    kiptopeke = STATION.model_copy(update={"id": "8632200", "flood_stages_ft": {"minor": 5.8}})
+    assert [i.threshold_ft for i in tide_events.build(kiptopeke, heights).flood] == [5.8] * 4
+    unconfigured = STATION.model_copy(update={"flood_stages_ft": {}})
+    events = tide_events.build(unconfigured, heights)
+    assert events.flood == [] and events.extrema
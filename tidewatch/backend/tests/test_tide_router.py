@@ -0,0 +1,53 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+from app.models.schemas import TideData, TideReading
+from app.routers import tide_router
+from app.services import noaa_service
+
+STATION = "8638610"
+
+
+def _request() -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/api/tides/current", "headers": [(b"accept-encoding", b"gzip")]})
+
+
+def test_current_tides_share_one_compressed_body(monkeypatch):
+    monkeypatch.setattr(tide_router, "_payloads", tide_router.LRUCache(maxsize=16))
+    now = datetime(2024, 9, 10, 12, 0)
+    readings = [
+        TideReading(timestamp=now + timedelta(hours=i), water_level_ft=0.0, prediction_ft=2.0, station_id=STATION)
+        for i in range(48)
+    ]
+    current = readings[0]
+
+    async def tide_data(station_id=None):
+        # A new TideData per call around the same cached readings, like noaa_service
+        return TideData(current=current, predictions=readings, station_id=STATION)
+
+    monkeypatch.setattr(noaa_service, "get_tide_data", tide_data)
+
+    async def run():
+        first = await tide_router.get_current_tides(_request(), station=STATION)
+        again = await tide_router.get_current_tides(_request(), station=STATION)
+        return first, again
+
+    first, again = asyncio.run(run())
+    assert first.headers["content-encoding"] == "gzip"
+    assert again.body is first.body
+
+    current = current.model_copy(update={"water_level_ft": 1.0})
+    refreshed = asyncio.run(tide_router.get_current_tides(_request(), station=STATION))
+    assert refreshed.body != first.body
+
+
+def test_prediction_hours_are_validated():
+    app = FastAPI()
+    app.include_router(tide_router.router)
+    client = TestClient(app)
+    for hours in (0, -6, 169):
+        assert client.get("/api/tides/predictions", params={"hours": hours}).status_code == 422
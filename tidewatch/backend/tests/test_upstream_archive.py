@@ -0,0 +1,72 @@
+import asyncio
+import gzip
+import json
+from datetime import timedelta
+
+import httpx
+
+from app.config import settings
+from app.services import upstream_archive
+
+PAYLOAD = {"predictions": [{"t": "2024-09-10 12:00", "v": "4.812"}]}
+
+
+def _gzip_upstream(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(
+        200,
+        headers={"content-type": "application/json", "content-encoding": "gzip"},
+        content=gzip.compress(json.dumps(PAYLOAD).encode()),
+    )
+
+
+def _record_and_replay(path: str) -> tuple[dict, dict]:
+    async def run():
+        recorder = upstream_archive.RecordingTransport(path, httpx.MockTransport(_gzip_upstream))
+        async with httpx.AsyncClient(transport=recorder) as client:
+            recorded = (await client.get("https://api.example/data", params={"station": "1", "begin_date": "a"})).json()
+
+        replayer = upstream_archive.ReplayTransport(path)
+        async with httpx.AsyncClient(transport=replayer) as client:
+            replayed = (await client.get("https://api.example/data", params={"begin_date": "b", "station": "1"})).json()
+        return recorded, replayed
+
+    return asyncio.run(run())
+
+
+def test_gzip_response_round_trips(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "replay_time_shift", False)
+    monkeypatch.setattr(settings, "replay_latency", False)
+    recorded, replayed = _record_and_replay(str(tmp_path / "upstream.jsonl.gz"))
+    assert recorded == PAYLOAD
+    assert replayed == PAYLOAD
+
+
+def test_unrecorded_url_is_a_gateway_timeout(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "replay_latency", False)
+    path = str(tmp_path / "upstream.jsonl.gz")
+    _record_and_replay(path)
+
+    async def run():
+        async with httpx.AsyncClient(transport=upstream_archive.ReplayTransport(path)) as client:
+            return await client.get("https://api.example/other")
+
+    assert asyncio.run(run()).status_code == 504
+
+
+def test_shift_timestamps_keeps_format():
+    text = '{"t": "2024-09-10 23:00", "validTime": "2024-09-10T06:00:00-04:00/PT1H", "d": "20240910"}'
+    shifted = upstream_archive.shift_timestamps(text, timedelta(hours=5))
+    assert shifted == '{"t": "2024-09-11 04:00", "validTime": "2024-09-10T11:00:00-04:00/PT1H", "d": "20240910"}'
+
+
+def test_request_key_keeps_the_date_window_length():
+    window = ("begin_date", "end_date")
+
+    def key(begin: str, end: str) -> str:
+        request = httpx.Request("GET", "https://api.example/data", params={"station": "1", "begin_date": begin, "end_date": end})
+        return upstream_archive.request_key(request, frozenset(), window)
+
+    two_days = key("20240910 12:00", "20240912 12:00")
+    assert key("20240911 06:00", "20240913 06:00") == two_days
+    assert key("20240910 12:00", "20240917 12:00") != two_days
+    assert "window=2880" in two_days
@@ -0,0 +1,40 @@
+from datetime import datetime
+
+import numpy as np
+
+from app.engine import vectorized
+from app.engine.risk_engine import calculate_risk
+from app.models.schemas import ElevationData, TideData, TideReading, WeatherData
+
+
+def _scalar(water_level, elevation, precipitation, wind_speed, direction):
+    tide = TideData(current=TideReading(
+        timestamp=datetime(2024, 9, 10), water_level_ft=water_level, prediction_ft=0.0, station_id="8638610"))
+    weather = WeatherData(precipitation_forecast_in=precipitation, wind_speed_mph=wind_speed, wind_direction=direction)
+    return calculate_risk(tide, weather, ElevationData(latitude=36.85, longitude=-76.29, elevation_ft=elevation))
+
+
+def test_vectorized_scores_match_the_scalar_engine():
+    rng = np.random.default_rng(7)
+    n = 500
+    water = rng.uniform(-1, 9, n)
+    elevation = rng.uniform(-3, 20, n)
+    precipitation = rng.uniform(0, 5, n)
+    wind = rng.uniform(0, 80, n)
+    points = rng.integers(0, len(vectorized.COMPASS_POINTS), n)
+    degrees = points * vectorized.SECTOR_DEGREES
+
+    scores = vectorized.risk_scores(water, elevation, precipitation, wind, vectorized.direction_multipliers(degrees))
+    grades = vectorized.grade_indices(scores)
+
+    for i in range(n):
+        risk = _scalar(water[i], elevation[i], precipitation[i], wind[i], vectorized.COMPASS_POINTS[points[i]])
+        assert scores[i] == risk.score
+        assert vectorized.GRADE_ORDER[grades[i]] == risk.grade
+
+
+def test_direction_multipliers_use_the_nearest_compass_sector():
+    degrees = np.array([0.0, 44.0, 46.0, 359.0, 720.0 + 90.0])
+    expected = [vectorized.direction_multipliers(np.array([vectorized.direction_to_degrees(p)]))[0]
+                for p in ("N", "NE", "NE", "N", "E")]
+    assert vectorized.direction_multipliers(degrees).tolist() == expected
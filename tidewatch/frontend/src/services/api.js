@@ -38,6 +38,15 @@ export async function assessRisk(address, latitude, longitude) {
   return resp.json();
 }
 
+// Tide, weather and sample-location risk in one request.
+// `fields` selects sections: any of "tide", "weather", "samples".
+export async function getDashboard(fields = []) {
+  const query = fields.length ? `?fields=${fields.join(",")}` : "";
+  const resp = await fetchWithRetry(`${API_BASE}/dashboard${query}`);
+  if (!resp.ok) throw new Error("Failed to load dashboard");
+  return resp.json();
+}
+
 export async function getSampleLocations() {
   const resp = await fetchWithRetry(`${API_BASE}/risk/sample`);
   return resp.json();
@@ -55,6 +64,13 @@ export async function getTidePredictions(hours = 48) {
   return resp.json();
 }
 
+export async function getTideEvents(station) {
+  const query = station ? `?station=${station}` : "";
+  const resp = await fetchWithRetry(`${API_BASE}/tides/events${query}`);
+  if (!resp.ok) throw new Error("Failed to load tide events");
+  return resp.json();
+}
+
 export async function getWeatherForecast() {
   const resp = await fetchWithRetry(`${API_BASE}/weather/forecast`);
   return resp.json();